@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+ANSI album-art benchmark - per-pixel renderer vs the vectorised one
+
+Renders one image at each width (30, 60 and 120 cells by default) with the
+per-pixel renderer the song detectors used to have and with
+tools/song-detector/ansi_art.py, after the same resize, and reports per
+width:
+
+  ms     time to quantise and build the lines, best of --repeat
+  bytes  size of the output written to the terminal
+
+Without --image a synthetic cover (flat areas, gradients and some noise) is
+used. Needs Pillow and NumPy:
+
+  python tools/benchmarks/ansi_album_art.py [--image cover.jpg]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(TOOLS_DIR, "song-detector"))
+
+import ansi_art  # noqa: E402
+
+
+def per_pixel_lines(rgb):
+    """The renderer as it was: rgb_to_ansi per pixel, one escape per cell"""
+    levels = [0, 95, 135, 175, 215, 255]
+
+    def closest_level(value):
+        return min(range(6), key=lambda i: abs(levels[i] - value))
+
+    lines = []
+    height, width = rgb.shape[:2]
+    pixels = rgb.tolist()
+    for y in range(height):
+        line = ""
+        for x in range(width):
+            r, g, b = pixels[y][x]
+            color_code = (
+                16 + 36 * closest_level(r) + 6 * closest_level(g) + closest_level(b)
+            )
+            line += f"\033[48;5;{color_code}m \033[0m"
+        lines.append(line)
+    return lines
+
+
+def vectorised_lines(rgb):
+    return ansi_art.ansi_lines(ansi_art.quantise(rgb))
+
+
+def synthetic_cover(path, size=600):
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:size, 0:size] / size
+    rgb = np.empty((size, size, 3))
+    rgb[..., 0] = 40 + 180 * x
+    rgb[..., 1] = 30 + 120 * y
+    rgb[..., 2] = 90
+    # A flat disc and a noisy band, like a logo over a photo
+    rgb[(x - 0.5) ** 2 + (y - 0.45) ** 2 < 0.05] = (230, 200, 40)
+    band = (y > 0.75) & (y < 0.9)
+    rgb[band] += rng.normal(0, 25, (band.sum(), 3))
+    Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8)).save(path)
+
+
+def best_of(repeat, render, rgb):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        lines = render(rgb)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, sum(len(line.encode()) + 1 for line in lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--image", help="album art to render (default: synthetic)")
+    parser.add_argument("--widths", type=int, nargs="+", default=[30, 60, 120])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image = args.image
+        if image is None:
+            image = os.path.join(tmp, "cover.png")
+            synthetic_cover(image)
+
+        print(
+            f"{'width':>6} {'per-pixel ms':>13} {'vectorised ms':>14} "
+            f"{'speedup':>8} {'bytes before':>13} {'bytes after':>12}"
+        )
+        for width in args.widths:
+            rgb = ansi_art.load_rgb(image, width)
+            old_ms, old_bytes = best_of(args.repeat, per_pixel_lines, rgb)
+            new_ms, new_bytes = best_of(args.repeat, vectorised_lines, rgb)
+            print(
+                f"{width:>6} {old_ms:>13.2f} {new_ms:>14.2f} "
+                f"{old_ms / new_ms:>7.1f}x {old_bytes:>13} {new_bytes:>12}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Audio callback benchmark - the capture stage of AudioInputSource
+
+Feeds synthetic blocks straight into AudioInputSource._audio_sample_callback
+at each input rate and block size, with analysis and subscribers switched
+off, so what is timed is what the callback itself does per block: wrap the
+buffer, resample to MIC_RATE and run the delay line. For comparison the
+previous queue-based delay line is run on the same blocks. Reports per
+configuration:
+
+  p50/p99/max  time per block, microseconds
+  alloc        peak memory allocated while handling one block, KiB
+               (tracemalloc, which numpy reports its buffers to)
+
+Needs a LedFx checkout with audio_capture_buffers.patch applied:
+
+  PYTHONPATH=path/to/LedFx python tools/benchmarks/audio_callback.py
+"""
+
+import argparse
+import queue
+import time
+import tracemalloc
+import types
+
+import numpy as np
+import samplerate
+
+from ledfx.effects.audio import AudioInputSource
+from ledfx.effects.melbank import MIC_RATE
+from ledfx.latency_tracer import LatencyTracer
+
+
+def make_source(rate, block, delay_ms):
+    """An AudioInputSource with just the state the callback touches."""
+    source = AudioInputSource.__new__(AudioInputSource)
+    # LedFx opens the stream with blocksize = rate / sample_rate
+    blocks_per_second = max(1, round(rate / block))
+    source._config = {"sample_rate": blocks_per_second, "delay_ms": delay_ms}
+    ledfx = types.SimpleNamespace(virtuals={}, config={})
+    ledfx.latency_tracer = LatencyTracer(ledfx)
+    source._ledfx = ledfx
+    source._raw_audio_sample = np.zeros(
+        MIC_RATE // blocks_per_second, dtype=np.float32
+    )
+    source._allocate_capture_buffers()
+    source.resampler = samplerate.Resampler("sinc_fastest", channels=1)
+    source.pre_process_audio = lambda: None
+    source._invoke_callbacks = lambda: None
+    return source
+
+
+def make_queue_callback(source, delay_ms):
+    """The callback as it was before the delay ring, for comparison."""
+    out_sample_len = len(source._raw_audio_sample)
+    blocks = int(0.001 * delay_ms * source._config["sample_rate"])
+    delay_queue = queue.Queue(maxsize=blocks) if blocks else None
+
+    def callback(in_data, frame_count, time_info, status):
+        captured = time.perf_counter()
+        raw_sample = np.frombuffer(in_data, dtype=np.float32)
+        if len(raw_sample) != out_sample_len:
+            sample = source.resampler.process(
+                raw_sample, out_sample_len / len(raw_sample)
+            )
+        else:
+            sample = raw_sample
+        if len(sample) != out_sample_len:
+            return
+        if delay_queue:
+            try:
+                delay_queue.put_nowait((sample, captured))
+            except queue.Full:
+                source._raw_audio_sample, source.block_stamp = (
+                    delay_queue.get_nowait()
+                )
+                delay_queue.put_nowait((sample, captured))
+        else:
+            source._raw_audio_sample = sample
+            source.block_stamp = captured
+
+    return callback
+
+
+def measure(callback, blocks, count):
+    # Warm up: fills the delay line and the resampler's state
+    for index in range(count // 4):
+        callback(blocks[index % len(blocks)], 0, None, None)
+
+    durations = []
+    for index in range(count):
+        started = time.perf_counter()
+        callback(blocks[index % len(blocks)], 0, None, None)
+        durations.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    peaks = []
+    for index in range(min(count, 200)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        callback(blocks[index % len(blocks)], 0, None, None)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    micros = np.array(durations) * 1e6
+    return {
+        "p50": float(np.percentile(micros, 50)),
+        "p99": float(np.percentile(micros, 99)),
+        "max": float(micros.max()),
+        "alloc": max(peaks) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rates", type=int, nargs="+", default=[44100, 48000])
+    parser.add_argument(
+        "--blocks", type=int, nargs="+", default=[256, 512, 1024, 2048]
+    )
+    parser.add_argument(
+        "--delay-ms", type=int, nargs="+", default=[0, 500], dest="delays"
+    )
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(
+        f"{'rate':>6} {'block':>6} {'delay':>6} {'mode':<6} "
+        f"{'p50 us':>8} {'p99 us':>8} {'max us':>8} {'alloc KiB':>10}"
+    )
+    for rate in args.rates:
+        for block in args.blocks:
+            blocks = [
+                (rng.standard_normal(block) * 0.1).astype(np.float32)
+                for _ in range(8)
+            ]
+            for delay_ms in args.delays:
+                source = make_source(rate, block, delay_ms)
+                legacy = make_source(rate, block, delay_ms)
+                for mode, callback in (
+                    ("queue", make_queue_callback(legacy, delay_ms)),
+                    ("ring", source._audio_sample_callback),
+                ):
+                    result = measure(callback, blocks, args.count)
+                    print(
+                        f"{rate:>6} {block:>6} {delay_ms:>6} {mode:<6} "
+                        f"{result['p50']:>8.1f} {result['p99']:>8.1f} "
+                        f"{result['max']:>8.1f} {result['alloc']:>10.2f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Audio dispatch benchmark - per-frame cost of AudioReactiveEffect fan-out
+
+Every audio frame AudioAnalysisSource calls each subscribed effect's
+_audio_data_updated. Before audio_dispatch.patch each call cleared the
+shared melbank cache and worked out the effect's stem selection again
+(canonical_stems sorts a set, twice) to see whether its chain had changed;
+now the source clears the cache once per frame and each effect compares a
+dispatch record built at activation. Both paths are run here, with the
+effects' own audio_data_updated a no-op, so what is timed is the dispatch
+alone. Reports per effect count:
+
+  p50/p99  time to dispatch one frame to every effect, microseconds
+  per fx   p50 divided by the number of effects, microseconds
+
+A quarter of the effects select a stem, the rest the full mix. Needs a
+LedFx checkout with stems.patch and audio_dispatch.patch applied:
+
+  PYTHONPATH=path/to/LedFx python tools/benchmarks/audio_dispatch.py
+"""
+
+import argparse
+import threading
+import time
+import types
+
+import numpy as np
+
+from ledfx.effects.audio import AudioReactiveEffect
+from ledfx.effects.stems import canonical_selection
+from ledfx.latency_tracer import LatencyTracer
+
+
+class StandInSource:
+    """The part of AudioAnalysisSource effect dispatch touches."""
+
+    def __init__(self):
+        self._stem_generation = 0
+        self._chains = {}
+
+    def stem_chain(self, stems, band="full"):
+        selection = canonical_selection(stems, band)
+        return self._chains.setdefault(
+            selection, types.SimpleNamespace(selection=selection)
+        )
+
+    def release_stem(self, stems, band="full"):
+        pass
+
+
+def make_effects(count, source):
+    ledfx = types.SimpleNamespace(config={})
+    ledfx.latency_tracer = LatencyTracer(ledfx)
+    effects = []
+    for index in range(count):
+        effect = AudioReactiveEffect.__new__(AudioReactiveEffect)
+        stems = ["drums"] if index % 4 == 0 else []
+        effect._config = {"stems": stems, "stem_band": "full"}
+        effect._ledfx = ledfx
+        effect._active = True
+        effect.lock = threading.Lock()
+        effect.NAME = "Benchmark"
+        effect._stem_chain = None
+        effect._stem_current = None
+        effect._stem_generation = -1
+        effect._dispatch = None
+        effect.audio = source
+        effect.audio_data_updated = lambda data: None
+        effect._build_dispatch()
+        effects.append(effect)
+    return effects
+
+
+def previous_frame(effects):
+    """_audio_data_updated as it was, for every effect."""
+    for effect in effects:
+        if effect._ledfx.latency_tracer.enabled:
+            effect.latency_trace = (None, time.perf_counter())
+        effect.melbank.cache_clear()
+        if (
+            effect.stem_selection != effect._stem_current
+            or getattr(effect.audio, "_stem_generation", 0)
+            != effect._stem_generation
+        ):
+            effect._sync_stem_chain()
+        with effect.lock:
+            if effect.is_active:
+                effect.audio_data_updated(effect._stem_chain or effect.audio)
+
+
+def dispatch_frame(effects):
+    """The source's one cache clear, then every effect's dispatch."""
+    AudioReactiveEffect.melbank.cache_clear()
+    for effect in effects:
+        effect._audio_data_updated()
+
+
+def measure(frame, effects, count):
+    for _ in range(count // 4):
+        frame(effects)
+    durations = []
+    for _ in range(count):
+        started = time.perf_counter()
+        frame(effects)
+        durations.append(time.perf_counter() - started)
+    micros = np.array(durations) * 1e6
+    return float(np.percentile(micros, 50)), float(np.percentile(micros, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--effects", type=int, nargs="+", default=[1, 16, 64, 128]
+    )
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(
+        f"{'effects':>8} {'mode':<9} {'p50 us':>9} {'p99 us':>9} "
+        f"{'per fx us':>10}"
+    )
+    for count in args.effects:
+        for mode, frame in (
+            ("previous", previous_frame),
+            ("dispatch", dispatch_frame),
+        ):
+            effects = make_effects(count, StandInSource())
+            p50, p99 = measure(frame, effects, args.count)
+            print(
+                f"{count:>8} {mode:<9} {p50:>9.1f} {p99:>9.1f} "
+                f"{p50 / count:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
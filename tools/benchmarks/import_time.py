@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark - what LedFx imports before it can start
+
+Finds the entry script of each PyInstaller spec (tools/win/win.spec and
+tools/linux/yzlinux.spec by default) and imports it under
+``python -X importtime``, together with the registry packages LedFxCore
+imports while starting (ledfx.api, ledfx.devices, ledfx.effects,
+ledfx.integrations). Reports per entry point:
+
+  total    cumulative import time of the startup import graph, ms (best run)
+  slowest  the modules with the largest self time
+
+Exits 1 on a regression:
+
+  * a module in LAZY_MODULES was imported - the optional feature behind it
+    now loads at startup whether or not its config enables it;
+  * with --baseline, the total grew by more than --tolerance over the saved
+    run, or top-level packages show up that the baseline did not import;
+  * with --budget-ms, the total is over budget.
+
+Timings only compare on the same machine, so record the baseline where the
+check runs:
+
+  PYTHONPATH=path/to/LedFx python tools/benchmarks/import_time.py --save base.json
+  PYTHONPATH=path/to/LedFx python tools/benchmarks/import_time.py --baseline base.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SPECS = (
+    os.path.join(TOOLS_DIR, "win", "win.spec"),
+    os.path.join(TOOLS_DIR, "linux", "yzlinux.spec"),
+)
+
+REGISTRY_PACKAGES = (
+    "ledfx.api",
+    "ledfx.devices",
+    "ledfx.effects",
+    "ledfx.integrations",
+)
+
+# Imported on first use only; each one showing up at startup is a regression
+LAZY_MODULES = {
+    "sentry_sdk": "Sentry (ledfx.sentry_config.setup_sentry)",
+    "dbus_fast": "MPRIS Now Playing",
+    "winrt": "SMTC Now Playing",
+    "jnius": "Android bridges",
+    "onnxruntime": "stem separation",
+}
+
+_ANALYSIS = re.compile(r"Analysis\(\s*\[\s*f?['\"]([^'\"]+)['\"]")
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+_STARTUP = """\
+import importlib
+import pkgutil
+
+import {entry}
+
+for package in {packages!r}:
+    module = importlib.import_module(package)
+    for info in pkgutil.iter_modules(module.__path__, package + "."):
+        try:
+            importlib.import_module(info.name)
+        except ImportError:
+            pass
+"""
+
+
+def entry_module(spec_path):
+    """Module name of the first script in a spec's Analysis()."""
+    with open(spec_path, encoding="utf-8") as f:
+        match = _ANALYSIS.search(f.read())
+    if match is None:
+        raise SystemExit(f"{spec_path}: no Analysis([...]) entry script found")
+    parts = [p for p in re.split(r"[\\/]+", match.group(1)) if p]
+    # Drop the spec's root placeholder, e.g. {spec_root}
+    parts = [p for p in parts if not p.startswith("{")]
+    return ".".join(parts)[: -len(".py")]
+
+
+def run_importtime(code):
+    """{module: (self_us, cumulative_us, depth)} for one fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=os.environ,
+    )
+    if result.returncode:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(2)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+def measure(entry, repeat):
+    interpreter = run_importtime("pass")
+    code = _STARTUP.format(entry=entry, packages=REGISTRY_PACKAGES)
+    best = None
+    for _ in range(repeat):
+        modules = {
+            name: timing
+            for name, timing in run_importtime(code).items()
+            if name not in interpreter
+        }
+        total = sum(cum for _, cum, depth in modules.values() if depth == 0)
+        if best is None or total < best[0]:
+            best = (total, modules)
+    total, modules = best
+    return {
+        "total_ms": round(total / 1000, 1),
+        "modules": {
+            name: round(timing[0] / 1000, 2) for name, timing in modules.items()
+        },
+        "packages": sorted({name.split(".")[0] for name in modules}),
+    }
+
+
+def check(entry, result, baseline, tolerance, budget_ms):
+    failures = []
+    for module, feature in LAZY_MODULES.items():
+        if module in result["packages"]:
+            failures.append(f"{module} imported at startup ({feature} is lazy)")
+
+    if budget_ms is not None and result["total_ms"] > budget_ms:
+        failures.append(f"{result['total_ms']} ms over the {budget_ms} ms budget")
+
+    saved = (baseline or {}).get(entry)
+    if saved:
+        limit = saved["total_ms"] * (1 + tolerance)
+        if result["total_ms"] > limit:
+            failures.append(
+                f"{result['total_ms']} ms vs {saved['total_ms']} ms baseline "
+                f"(+{tolerance:.0%} allowed)"
+            )
+        added = sorted(set(result["packages"]) - set(saved["packages"]))
+        if added:
+            failures.append("new packages at startup: " + ", ".join(added))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "specs",
+        nargs="*",
+        default=DEFAULT_SPECS,
+        help="PyInstaller spec files (default: win.spec and yzlinux.spec)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--save", metavar="FILE", help="write the results as a baseline"
+    )
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--budget-ms", type=float)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # Both specs build from ledfx/__main__.py today; measure each entry once
+    entries = {}
+    for spec in args.specs:
+        entries.setdefault(entry_module(spec), []).append(os.path.basename(spec))
+
+    results = {}
+    failed = False
+    for entry, specs in entries.items():
+        result = results[entry] = measure(entry, args.repeat)
+        print(f"{entry} ({', '.join(specs)}): {result['total_ms']} ms total")
+        slowest = sorted(result["modules"].items(), key=lambda kv: -kv[1])
+        for name, ms in slowest[: args.top]:
+            print(f"  {ms:8.2f} ms  {name}")
+        for failure in check(entry, result, baseline, args.tolerance, args.budget_ms):
+            print(f"  FAIL {failure}")
+            failed = True
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
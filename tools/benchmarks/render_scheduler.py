@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Render scheduler benchmark - one thread per virtual vs the shared scheduler
+
+Runs N synthetic virtuals (a numpy effect over --pixels pixels each) for a
+few seconds, first each on its own thread with the same sleep logic as
+Virtual.thread_function, then driven by ledfx.render_scheduler, and reports
+per mode:
+
+  fps      achieved frames per second per virtual (mean / worst virtual)
+  jitter   standard deviation of the frame period, ms
+  cpu      process CPU time per wall second
+  threads  Python threads alive while rendering
+
+Needs a LedFx checkout with render_scheduler.patch applied:
+
+  PYTHONPATH=path/to/LedFx python tools/benchmarks/render_scheduler.py
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from ledfx.render_scheduler import RenderScheduler
+from ledfx.utils import fps_to_sleep_interval
+
+
+class SyntheticVirtual:
+    """Just enough of a Virtual for the scheduler."""
+
+    def __init__(self, index, pixels, refresh_rate):
+        self.id = f"virtual-{index}"
+        self.refresh_rate = refresh_rate
+        self._active = True
+        self._phase = np.linspace(0, 2 * np.pi, pixels)
+        self._frame = np.zeros((pixels, 3))
+        self.starts = []
+
+    def render_frame(self, start_time):
+        self.starts.append(start_time)
+        # Roughly a simple audio-reactive effect: a few vectorised passes
+        wave = np.sin(self._phase + start_time * 4)
+        self._frame[:, 0] = wave * 127 + 128
+        self._frame[:, 1] = np.roll(self._frame[:, 0], 7)
+        self._frame[:, 2] = 255 - self._frame[:, 0]
+        np.clip(self._frame, 0, 255, self._frame)
+
+    def thread_function(self):
+        # Virtual.thread_function's cadence, minus the Android boost
+        while self._active:
+            start_time = time.perf_counter()
+            self.render_frame(start_time)
+            run_time = time.perf_counter() - start_time
+            time.sleep(max(0.001, fps_to_sleep_interval(self.refresh_rate) - run_time))
+
+
+def summarise(virtuals, seconds, cpu, threads):
+    fps = []
+    periods = []
+    for virtual in virtuals:
+        starts = virtual.starts
+        fps.append(len(starts) / seconds)
+        periods.extend(np.diff(starts) * 1000)
+    return {
+        "fps": statistics.mean(fps),
+        "worst_fps": min(fps),
+        "jitter": statistics.pstdev(periods) if periods else 0.0,
+        "cpu": cpu / seconds,
+        "threads": threads,
+    }
+
+
+def run_threads(count, args):
+    virtuals = [
+        SyntheticVirtual(i, args.pixels, args.fps) for i in range(count)
+    ]
+    threads = [
+        threading.Thread(target=virtual.thread_function) for virtual in virtuals
+    ]
+    cpu_start = time.process_time()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    alive = threading.active_count()
+    for virtual in virtuals:
+        virtual._active = False
+    for thread in threads:
+        thread.join()
+    return summarise(virtuals, args.seconds, time.process_time() - cpu_start, alive)
+
+
+def run_scheduler(count, args):
+    scheduler = RenderScheduler(enabled=True, workers=args.workers)
+    virtuals = [
+        SyntheticVirtual(i, args.pixels, args.fps) for i in range(count)
+    ]
+    cpu_start = time.process_time()
+    for virtual in virtuals:
+        scheduler.add(virtual)
+    time.sleep(args.seconds)
+    alive = threading.active_count()
+    for virtual in virtuals:
+        virtual._active = False
+        scheduler.remove(virtual)
+    result = summarise(
+        virtuals, args.seconds, time.process_time() - cpu_start, alive
+    )
+    result["fps_scale"] = scheduler.fps_scale
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--virtuals", type=int, nargs="+", default=[10, 50, 200]
+    )
+    parser.add_argument("--pixels", type=int, default=300)
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print(
+        f"{args.pixels} px virtuals at {args.fps} fps, {args.seconds:.0f} s per run"
+    )
+    print(
+        f"{'virtuals':>8} {'mode':<10} {'fps':>7} {'worst':>7} "
+        f"{'jitter ms':>10} {'cpu':>6} {'threads':>8}"
+    )
+    for count in args.virtuals:
+        for mode, run in (("threads", run_threads), ("scheduler", run_scheduler)):
+            result = run(count, args)
+            line = (
+                f"{count:>8} {mode:<10} {result['fps']:>7.1f} "
+                f"{result['worst_fps']:>7.1f} {result['jitter']:>10.2f} "
+                f"{result['cpu']:>6.2f} {result['threads']:>8}"
+            )
+            if "fps_scale" in result:
+                line += f"   (fps scale {result['fps_scale']:.2f})"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Media session replay - a recorded session through the detector and NowPlaying
+
+Replays a recording made with
+
+  python tools/song-detector/blade-song-detector.py --record session.jsonl
+
+through tools/song-detector/session_replay.py, as fast as it runs, and
+reports for blade-song-detector.py's sends and for LedFx NowPlaying's
+song_detected emissions:
+
+  updates        messages emitted
+  track changes  changes of track among them
+  false          of which to a placeholder title, or to a track gone again
+                 within --false-window seconds
+  latency        from a change in the provider's state (new track, play or
+                 pause) to the next emission, p50 / p95 / max in ms
+  missed         provider state changes with no emission before the next one
+
+Changes to should_send_update, the stream merge or the drift thresholds in
+playback_clock.py can be judged by replaying the same sessions before and
+after. Needs nothing beyond the standard library:
+
+  python tools/benchmarks/replay_media_session.py session.jsonl [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(TOOLS_DIR, "song-detector"))
+
+import session_replay  # noqa: E402
+
+
+def print_report(path, report):
+    sources = ", ".join(f"{source} {count}" for source, count in sorted(report["sources"].items()))
+    print(f"{path}: {report['records']} records ({sources})")
+    print(
+        f"session {report['session_seconds']:.1f} s, replayed in "
+        f"{report['replay_seconds'] * 1000:.1f} ms ({report['speedup'] or '-'}x), "
+        f"{report['state_changes']} provider state changes"
+    )
+    print(
+        f"{'':<11} {'updates':>8} {'tracks':>7} {'false':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'missed':>7}"
+    )
+    for name in ("detector", "nowplaying"):
+        result = report[name]
+        latency = result["latency_ms"]
+
+        def ms(value):
+            return "-" if value is None else f"{value:.1f}"
+
+        print(
+            f"{name:<11} {result['updates']:>8} {result['track_changes']:>7} "
+            f"{result['false_track_changes']:>6} {ms(latency['p50']):>8} "
+            f"{ms(latency['p95']):>8} {ms(latency['max']):>8} {result['missed_changes']:>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("recordings", nargs="+", help="JSON-lines files from --record")
+    parser.add_argument("--false-window", type=float, default=session_replay.FALSE_CHANGE_WINDOW,
+                        help="a track shorter than this (seconds) is a false change")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    args = parser.parse_args()
+
+    reports = {}
+    for path in args.recordings:
+        records = session_replay.load_session(path)
+        reports[path] = session_replay.replay(records, args.false_window)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    for index, (path, report) in enumerate(reports.items()):
+        if index:
+            print()
+        print_report(path, report)
+
+
+if __name__ == "__main__":
+    main()
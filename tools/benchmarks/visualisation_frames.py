@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Visualisation frame benchmark - JSON vs binary WebSocket frames
+
+Streams synthetic 64x64 matrix frames through the same serialisation the
+LedFx WebSocket uses and reports bytes/s and per-frame encode time for:
+
+  json-uncompressed  visualisation_update with a nested pixel list
+  json-compressed    visualisation_update with base64 pixels (the default)
+  binary-rgb         raw RGB binary frame
+  binary-rle         run-length encoded binary frame
+  binary-delta       changed pixels only, nothing for unchanged frames
+
+Needs a LedFx checkout with visualisation_subscriptions.patch and
+visualisation_binary_frames.patch applied:
+
+  PYTHONPATH=path/to/LedFx python tools/benchmarks/visualisation_frames.py
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ledfx.visualisation import BinaryFrameEncoder, serialise_visualisation
+
+
+def make_frames(count, rows, cols, static_fraction, seed=0):
+    """Matrix-like content: a scrolling gradient over part of the panel, the
+    rest unchanged between frames (background, text, idle areas)."""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, (rows * cols, 3), dtype=np.uint8)
+    moving = int(rows * (1 - static_fraction))
+    x = np.arange(cols)
+    frames = []
+    for i in range(count):
+        frame = base.copy().reshape(rows, cols, 3)
+        hue = (x * 4 + i * 6) % 256
+        frame[:moving, :, 0] = hue
+        frame[:moving, :, 1] = 255 - hue
+        frame[:moving, :, 2] = (hue * 2) % 256
+        frames.append(frame.reshape(-1, 3))
+    return frames
+
+
+def run_json(frames, shape, mode):
+    sent = 0
+    start = time.perf_counter()
+    for pixels in frames:
+        message = {
+            "id": 1,
+            "type": "event",
+            "event_type": "visualisation_update",
+            "vis_id": "matrix",
+            "is_device": False,
+            "pixels": serialise_visualisation(pixels, mode),
+            "shape": shape,
+        }
+        sent += len(json.dumps(message))
+    return sent, time.perf_counter() - start
+
+
+def run_binary(frames, shape, encoding):
+    encoder = BinaryFrameEncoder(1, encoding)
+    sent = 0
+    start = time.perf_counter()
+    for pixels in frames:
+        data = encoder.encode(pixels, shape)
+        if data is not None:
+            sent += len(data)
+    return sent, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matrices", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=64)
+    parser.add_argument("--cols", type=int, default=64)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument(
+        "--static",
+        type=float,
+        default=0.5,
+        help="fraction of each frame that does not change (default 0.5)",
+    )
+    args = parser.parse_args()
+
+    count = int(args.fps * args.seconds)
+    shape = (args.rows, args.cols)
+    frames = make_frames(count, args.rows, args.cols, args.static)
+
+    runs = [
+        ("json-uncompressed", lambda: run_json(frames, shape, "uncompressed")),
+        ("json-compressed", lambda: run_json(frames, shape, "compressed")),
+        ("binary-rgb", lambda: run_binary(frames, shape, "rgb")),
+        ("binary-rle", lambda: run_binary(frames, shape, "rle")),
+        ("binary-delta", lambda: run_binary(frames, shape, "delta")),
+    ]
+
+    print(
+        f"{args.matrices} x {args.rows}x{args.cols} matrices at {args.fps} fps, "
+        f"{args.static:.0%} static"
+    )
+    print(f"{'format':<18} {'KB/s':>10} {'ms/frame':>10} {'loop %':>8}")
+    for name, run in runs:
+        sent, elapsed = run()
+        kb_per_second = sent * args.matrices / args.seconds / 1024
+        ms_per_frame = elapsed / count * 1000
+        # Share of the event loop spent encoding, all matrices together
+        loop_share = ms_per_frame * args.matrices * args.fps / 10
+        print(
+            f"{name:<18} {kb_per_second:>10.1f} {ms_per_frame:>10.3f} "
+            f"{loop_share:>7.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+ANSI album art - images as rows of 256-colour terminal cells
+
+Both album-art renderers (Terminal Plus in blade-song-detector.py and
+render-album-art.py) used to quantise pixel by pixel in Python, running a
+min() over the six cube levels three times per pixel, and emitted a colour
+escape plus a reset for every single cell.
+
+Here the quantiser is a table lookup over the whole image at once: each
+channel goes through a 256-entry LUT that already holds its share of the
+colour code (16 + 36*r + 6*g + b), so the codes are three NumPy gathers and
+two additions. Rendering merges consecutive cells of the same colour into
+one escape sequence followed by a run of spaces, and resets once per line.
+Album art is mostly flat areas and soft gradients, so that is far fewer
+bytes to build and to send to the terminal, and it looks the same.
+
+AlbumArtCache keeps the rendered lines per artwork and width, so a redraw
+loop only re-reads the image when the file changes and only re-renders when
+the artwork or the terminal width does.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+# The 6 levels of each axis of the xterm 216-colour cube (codes 16-231)
+LEVELS = (0, 95, 135, 175, 215, 255)
+
+# Nearest cube level for every 8-bit value; ties go to the lower level,
+# as the per-pixel min() did
+LEVEL_LUT = np.abs(
+    np.arange(256)[:, None] - np.array(LEVELS)[None, :]
+).argmin(axis=1).astype(np.uint8)
+
+# Per-channel share of the colour code, so a pixel's code is a sum of three
+# lookups. The largest code is 231, so uint8 arithmetic cannot overflow.
+RED_LUT = (16 + 36 * LEVEL_LUT).astype(np.uint8)
+GREEN_LUT = (6 * LEVEL_LUT).astype(np.uint8)
+BLUE_LUT = LEVEL_LUT
+
+BACKGROUND = tuple(f"\033[48;5;{code}m" for code in range(256))
+RESET = "\033[0m"
+
+
+def rgb_to_ansi(r, g, b):
+    """Convert RGB values to ANSI 256-color code"""
+    return int(RED_LUT[r]) + int(GREEN_LUT[g]) + int(BLUE_LUT[b])
+
+
+def quantise(rgb):
+    """ANSI colour code of every pixel of an (height, width, 3) uint8 array"""
+    return RED_LUT[rgb[..., 0]] + GREEN_LUT[rgb[..., 1]] + BLUE_LUT[rgb[..., 2]]
+
+
+def ansi_lines(codes):
+    """One string per row of colour codes, one escape per run of a colour"""
+    lines = []
+    width = codes.shape[1]
+    # Column where each run starts: the first, and wherever the colour changes
+    changes = np.ones(codes.shape, dtype=bool)
+    changes[:, 1:] = codes[:, 1:] != codes[:, :-1]
+    for row, row_changes in zip(codes, changes):
+        starts = np.flatnonzero(row_changes).tolist()
+        colours = row[starts].tolist()
+        ends = starts[1:] + [width]
+        lines.append(
+            "".join(
+                BACKGROUND[colour] + " " * (end - start)
+                for colour, start, end in zip(colours, starts, ends)
+            )
+            + RESET
+        )
+    return lines
+
+
+def resize_rgb(img, width):
+    """An image resized to width cells, as an (height, width, 3) array
+
+    Terminal cells are about twice as tall as wide, so the height is halved
+    to keep the aspect ratio.
+    """
+    aspect_ratio = img.height / img.width
+    height = int(width * aspect_ratio * 0.5)
+    img = img.resize((width, height), Image.Resampling.LANCZOS)
+    return np.asarray(img.convert('RGB'))
+
+
+def load_rgb(image_path, width):
+    """An image file resized to width cells, see resize_rgb"""
+    with Image.open(image_path) as img:
+        return resize_rgb(img, width)
+
+
+def render_ansi(image_path, width):
+    """Lines of ANSI colour blocks for an image file, width cells wide"""
+    return ansi_lines(quantise(load_rgb(image_path, width)))
+
+
+class AlbumArtCache:
+    """Rendered album art per (artwork, width)
+
+    lines() costs one os.stat() while the file is unchanged. When its mtime
+    or size change the file is read and hashed, and only new content is
+    decoded; the same cover saved again on every track update renders
+    nothing. The decoded image is kept, so a new width (a resized terminal)
+    renders without touching the file. Safe to call from a worker thread,
+    e.g. to prerender() a width ahead of the next redraw.
+    """
+
+    def __init__(self, max_frames=8):
+        self.max_frames = max_frames
+        self._lock = threading.Lock()
+        self._stat = None
+        self._digest = None
+        self._source = None
+        self._frames = OrderedDict()
+        # Counters, to see the cache working
+        self.reads = 0
+        self.renders = 0
+
+    def lines(self, image_path, width):
+        """Lines for the image at width, or None if it cannot be read"""
+        with self._lock:
+            try:
+                stat = os.stat(image_path)
+            except OSError:
+                return None
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+            if stat_key != self._stat and not self._load(image_path, stat_key):
+                # Probably caught mid-write; keep showing what we have
+                return self._frames.get((self._digest, width))
+            return self._frame(width)
+
+    def prerender(self, width):
+        """Render the current artwork at width, if it isn't already"""
+        with self._lock:
+            if self._source is not None:
+                self._frame(width)
+
+    def _load(self, image_path, stat_key):
+        try:
+            with open(image_path, 'rb') as f:
+                data = f.read()
+            self.reads += 1
+            digest = hashlib.sha1(data).hexdigest()
+            if digest != self._digest:
+                with Image.open(io.BytesIO(data)) as img:
+                    source = img.convert('RGB')
+                self._source = source
+                self._digest = digest
+        except (OSError, ValueError):
+            return False
+        self._stat = stat_key
+        return True
+
+    def _frame(self, width):
+        key = (self._digest, width)
+        lines = self._frames.get(key)
+        if lines is None:
+            lines = ansi_lines(quantise(resize_rgb(self._source, width)))
+            self.renders += 1
+            self._frames[key] = lines
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+        else:
+            self._frames.move_to_end(key)
+        return lines
@@ -5,12 +5,14 @@ Connects to LedFx WebSocket API and sends track info with position/duration data
 """
 
 import asyncio
+import atexit
 import os
 import argparse
 import platform
 import subprocess
 import json
 import shutil
+import signal
 import sys
 import base64
 import time
@@ -18,9 +20,16 @@ from pathlib import Path
 from urllib.parse import quote
 from datetime import datetime
 
-# PIL for album art rendering
+from ledfx_fanout import FanOut, HEALTH_INTERVAL
+from media_updates import (NO_MEDIA, at_track_end, merge_stream_payload,
+                           parse_time_value, should_send_update, stream_message_kind)
+from playback_clock import PlaybackClock
+from screen_buffer import ScreenBuffer
+from session_replay import SessionRecorder
+
+# PIL (and NumPy) for album art rendering
 try:
-    from PIL import Image
+    import ansi_art
     PIL_AVAILABLE = True
     PIL_ERROR = None
 except ImportError as e:
@@ -38,10 +47,26 @@ except ImportError:
 # Global WebSocket connection
 ws_connection = None
 client_id = None
+# Daemon mode: one connection per LedFx instance instead (ledfx_fanout)
+fanout = None
+# --record: every provider sample goes to a JSON-lines file (session_replay)
+recorder = None
+
+# Terminal Plus album art, rendered once per artwork and width
+album_art_cache = ansi_art.AlbumArtCache() if PIL_AVAILABLE else None
+# Terminal Plus title in the block font, rendered once per track
+title_strip = None
 
 # Global mode selection
 USE_PROTOCOL = False
 
+# Terminal dashboards redraw differentially (screen_buffer), so they can run
+# at 10 Hz for a smooth progress bar while the media session is still polled
+# once a second
+REDRAW_INTERVAL = 0.1
+MEDIA_POLL_INTERVAL = 1.0
+TITLE_SCROLL_SPEED = 3  # columns per second
+
 # ANSI color codes for terminal output - BLADE THEME
 # Change these values to switch the entire theme!
 class Colors:
@@ -159,122 +184,110 @@ def print_progress_bar(position, duration, width=40):
     bar_center = bar_start + (width // 2)
     print(f"{' ' * bar_center}{Colors.SECONDARY}▸ {percentage:.1f}%{Colors.ENDC}")
 
-def rgb_to_ansi(r, g, b):
-    """Convert RGB values to ANSI 256-color code"""
-    levels = [0, 95, 135, 175, 215, 255]
-    
-    def closest_level(value):
-        return min(range(6), key=lambda i: abs(levels[i] - value))
-    
-    r_idx = closest_level(r)
-    g_idx = closest_level(g)
-    b_idx = closest_level(b)
-    
-    color_code = 16 + 36 * r_idx + 6 * g_idx + b_idx
-    return color_code
+# Ultra-simple consistent 5-line block font, uppercase only
+BLOCK_FONT = {
+    'A': [' ███  ', '█   █ ', '█████ ', '█   █ ', '█   █ '],
+    'B': ['████  ', '█   █ ', '████  ', '█   █ ', '████  '],
+    'C': [' ███  ', '█     ', '█     ', '█     ', ' ███  '],
+    'D': ['████  ', '█   █ ', '█   █ ', '█   █ ', '████  '],
+    'E': ['█████ ', '█     ', '███   ', '█     ', '█████ '],
+    'F': ['█████ ', '█     ', '███   ', '█     ', '█     '],
+    'G': [' ███  ', '█     ', '█  ██ ', '█   █ ', ' ███  '],
+    'H': ['█   █ ', '█   █ ', '█████ ', '█   █ ', '█   █ '],
+    'I': ['█████ ', '  █   ', '  █   ', '  █   ', '█████ '],
+    'J': ['  ███ ', '   █  ', '   █  ', '█  █  ', ' ██   '],
+    'K': ['█   █ ', '█  █  ', '███   ', '█  █  ', '█   █ '],
+    'L': ['█     ', '█     ', '█     ', '█     ', '█████ '],
+    'M': ['█   █ ', '██ ██ ', '█ █ █ ', '█   █ ', '█   █ '],
+    'N': ['█   █ ', '██  █ ', '█ █ █ ', '█  ██ ', '█   █ '],
+    'O': [' ███  ', '█   █ ', '█   █ ', '█   █ ', ' ███  '],
+    'P': ['████  ', '█   █ ', '████  ', '█     ', '█     '],
+    'Q': [' ███  ', '█   █ ', '█   █ ', '█  █  ', ' ██ █ '],
+    'R': ['████  ', '█   █ ', '████  ', '█  █  ', '█   █ '],
+    'S': [' ███  ', '█     ', ' ███  ', '    █ ', '████  '],
+    'T': ['█████ ', '  █   ', '  █   ', '  █   ', '  █   '],
+    'U': ['█   █ ', '█   █ ', '█   █ ', '█   █ ', ' ███  '],
+    'V': ['█   █ ', '█   █ ', '█   █ ', ' █ █  ', '  █   '],
+    'W': ['█   █ ', '█   █ ', '█ █ █ ', '██ ██ ', '█   █ '],
+    'X': ['█   █ ', ' █ █  ', '  █   ', ' █ █  ', '█   █ '],
+    'Y': ['█   █ ', ' █ █  ', '  █   ', '  █   ', '  █   '],
+    'Z': ['█████ ', '   █  ', '  █   ', ' █    ', '█████ '],
+    '0': [' ███  ', '█   █ ', '█ █ █ ', '█   █ ', ' ███  '],
+    '1': ['  █   ', ' ██   ', '  █   ', '  █   ', '█████ '],
+    '2': [' ███  ', '█   █ ', '   █  ', '  █   ', '█████ '],
+    '3': ['████  ', '    █ ', ' ███  ', '    █ ', '████  '],
+    '4': ['█   █ ', '█   █ ', '█████ ', '    █ ', '    █ '],
+    '5': ['█████ ', '█     ', '████  ', '    █ ', '████  '],
+    '6': [' ███  ', '█     ', '████  ', '█   █ ', ' ███  '],
+    '7': ['█████ ', '    █ ', '   █  ', '  █   ', '  █   '],
+    '8': [' ███  ', '█   █ ', ' ███  ', '█   █ ', ' ███  '],
+    '9': [' ███  ', '█   █ ', ' ████ ', '    █ ', ' ███  '],
+    ' ': ['      ', '      ', '      ', '      ', '      '],
+    '-': ['      ', '      ', '█████ ', '      ', '      '],
+    '(': ['  █   ', ' █    ', ' █    ', ' █    ', '  █   '],
+    ')': ['  █   ', '   █  ', '   █  ', '   █  ', '  █   '],
+    '.': ['      ', '      ', '      ', '      ', '  █   '],
+    ',': ['      ', '      ', '      ', '   █  ', '  █   '],
+    '!': ['  █   ', '  █   ', '  █   ', '      ', '  █   '],
+    '?': [' ███  ', '█   █ ', '   █  ', '      ', '  █   '],
+    '\'': [' █    ', '  █   ', '      ', '      ', '      '],
+    '"': ['█ █   ', '█ █   ', '      ', '      ', '      '],
+    '&': [' ██   ', '█  █  ', ' ██   ', '█  █  ', ' ██ █ '],
+}
+
+# Each glyph row with its spacing column, joined per title instead of per
+# character and frame; unknown characters are a blank column as wide
+_FONT_CELLS = {char: [row + ' ' for row in rows] for char, rows in BLOCK_FONT.items()}
+_UNKNOWN_CELLS = ['      '] * 5
 
 def text_to_ansi_art(text, max_width=60):
     """Convert text to simple consistent block font - uppercase only"""
-    # Ultra-simple consistent 5-line block font
-    patterns = {
-        'A': [' ███  ', '█   █ ', '█████ ', '█   █ ', '█   █ '],
-        'B': ['████  ', '█   █ ', '████  ', '█   █ ', '████  '],
-        'C': [' ███  ', '█     ', '█     ', '█     ', ' ███  '],
-        'D': ['████  ', '█   █ ', '█   █ ', '█   █ ', '████  '],
-        'E': ['█████ ', '█     ', '███   ', '█     ', '█████ '],
-        'F': ['█████ ', '█     ', '███   ', '█     ', '█     '],
-        'G': [' ███  ', '█     ', '█  ██ ', '█   █ ', ' ███  '],
-        'H': ['█   █ ', '█   █ ', '█████ ', '█   █ ', '█   █ '],
-        'I': ['█████ ', '  █   ', '  █   ', '  █   ', '█████ '],
-        'J': ['  ███ ', '   █  ', '   █  ', '█  █  ', ' ██   '],
-        'K': ['█   █ ', '█  █  ', '███   ', '█  █  ', '█   █ '],
-        'L': ['█     ', '█     ', '█     ', '█     ', '█████ '],
-        'M': ['█   █ ', '██ ██ ', '█ █ █ ', '█   █ ', '█   █ '],
-        'N': ['█   █ ', '██  █ ', '█ █ █ ', '█  ██ ', '█   █ '],
-        'O': [' ███  ', '█   █ ', '█   █ ', '█   █ ', ' ███  '],
-        'P': ['████  ', '█   █ ', '████  ', '█     ', '█     '],
-        'Q': [' ███  ', '█   █ ', '█   █ ', '█  █  ', ' ██ █ '],
-        'R': ['████  ', '█   █ ', '████  ', '█  █  ', '█   █ '],
-        'S': [' ███  ', '█     ', ' ███  ', '    █ ', '████  '],
-        'T': ['█████ ', '  █   ', '  █   ', '  █   ', '  █   '],
-        'U': ['█   █ ', '█   █ ', '█   █ ', '█   █ ', ' ███  '],
-        'V': ['█   █ ', '█   █ ', '█   █ ', ' █ █  ', '  █   '],
-        'W': ['█   █ ', '█   █ ', '█ █ █ ', '██ ██ ', '█   █ '],
-        'X': ['█   █ ', ' █ █  ', '  █   ', ' █ █  ', '█   █ '],
-        'Y': ['█   █ ', ' █ █  ', '  █   ', '  █   ', '  █   '],
-        'Z': ['█████ ', '   █  ', '  █   ', ' █    ', '█████ '],
-        '0': [' ███  ', '█   █ ', '█ █ █ ', '█   █ ', ' ███  '],
-        '1': ['  █   ', ' ██   ', '  █   ', '  █   ', '█████ '],
-        '2': [' ███  ', '█   █ ', '   █  ', '  █   ', '█████ '],
-        '3': ['████  ', '    █ ', ' ███  ', '    █ ', '████  '],
-        '4': ['█   █ ', '█   █ ', '█████ ', '    █ ', '    █ '],
-        '5': ['█████ ', '█     ', '████  ', '    █ ', '████  '],
-        '6': [' ███  ', '█     ', '████  ', '█   █ ', ' ███  '],
-        '7': ['█████ ', '    █ ', '   █  ', '  █   ', '  █   '],
-        '8': [' ███  ', '█   █ ', ' ███  ', '█   █ ', ' ███  '],
-        '9': [' ███  ', '█   █ ', ' ████ ', '    █ ', ' ███  '],
-        ' ': ['      ', '      ', '      ', '      ', '      '],
-        '-': ['      ', '      ', '█████ ', '      ', '      '],
-        '(': ['  █   ', ' █    ', ' █    ', ' █    ', '  █   '],
-        ')': ['  █   ', '   █  ', '   █  ', '   █  ', '  █   '],
-        '.': ['      ', '      ', '      ', '      ', '  █   '],
-        ',': ['      ', '      ', '      ', '   █  ', '  █   '],
-        '!': ['  █   ', '  █   ', '  █   ', '      ', '  █   '],
-        '?': [' ███  ', '█   █ ', '   █  ', '      ', '  █   '],
-        '\'': [' █    ', '  █   ', '      ', '      ', '      '],
-        '"': ['█ █   ', '█ █   ', '      ', '      ', '      '],
-        '&': [' ██   ', '█  █  ', ' ██   ', '█  █  ', ' ██ █ '],
-    }
-    
     # Truncate text if too long
     if len(text) > max_width // 7:  # Each char is ~7 units wide
         text = text[:max_width // 7 - 1] + '…'
     
     # Build 5 lines - force uppercase for consistent clean look
-    lines = ['', '', '', '', '']
-    for char in text.upper():
-        if char in patterns:
-            pattern = patterns[char]
-            for i in range(5):
-                lines[i] += pattern[i] + ' '
-        else:
-            # Unknown character, use space
-            for i in range(5):
-                lines[i] += '      '
-    
-    return lines
+    glyphs = [_FONT_CELLS.get(char, _UNKNOWN_CELLS) for char in text.upper()]
+    return [''.join(glyph[i] for glyph in glyphs) for i in range(5)]
+
+class TitleStrip:
+    """A title rendered once in the block font and scrolled as a circular view
+
+    The strip is the title followed by a gap, stored twice over so any
+    window of up to one period is a single slice; a scroll offset is taken
+    modulo the period. Per frame that costs a slice of the visible width,
+    however long the title.
+    """
+    GAP = "     "  # Spacing before the title comes round again
+    
+    def __init__(self, text):
+        self.text = text
+        self.lines = text_to_ansi_art(text, max_width=999999)  # Don't truncate, we scroll instead
+        self.width = len(self.lines[0]) if self.lines else 0
+        self.period = self.width + len(self.GAP)
+        self._strip = [line + self.GAP + line for line in self.lines]
+    
+    def view(self, offset, max_width):
+        """The lines visible at a scroll offset, the whole title if it fits"""
+        if self.width <= max_width:
+            return self.lines
+        start = offset % self.period
+        return [line[start:start + max_width] for line in self._strip]
 
 def render_album_art_ansi(image_path, width=None):
     """Render album art as ANSI colored blocks - returns list of lines for side-by-side layout"""
     if width is None:
         width = WidgetConfig.get_album_art_width()
     
-    if not PIL_AVAILABLE or not os.path.exists(image_path):
+    if not PIL_AVAILABLE:
         return None
     
     try:
-        img = Image.open(image_path)
-        aspect_ratio = img.height / img.width
-        height = int(width * aspect_ratio * 0.5)
-        
-        img = img.resize((width, height), Image.Resampling.LANCZOS)
-        img = img.convert('RGB')
-        pixels = img.load()
-        
-        # Build lines for album art
-        lines = []
-        lines.append(f"{Colors.SEPARATOR}{'─' * width}{Colors.ENDC}")
-        
-        for y in range(height):
-            line = ""
-            for x in range(width):
-                r, g, b = pixels[x, y]
-                color_code = rgb_to_ansi(r, g, b)
-                line += f"\033[48;5;{color_code}m \033[0m"
-            lines.append(line)
-        
-        lines.append(f"{Colors.SEPARATOR}{'─' * width}{Colors.ENDC}")
-        return lines
+        lines = album_art_cache.lines(image_path, width)
+        if lines is None:
+            return None
+        separator = f"{Colors.SEPARATOR}{'─' * width}{Colors.ENDC}"
+        return [separator, *lines, separator]
     except Exception:
         return None
 
@@ -295,24 +308,13 @@ def display_player_widget(info, artwork_lines, scroll_offset=0):
     info_lines.append(f"{Colors.ACCENT}{artist}{Colors.ENDC}")
     info_lines.append("")
     
-    # Title as ANSI art (larger appearance)
+    # Title as ANSI art (larger appearance), rendered once per track and
+    # scrolled when wider than the space for it
+    global title_strip
     title = info.get("title", "Unknown Title")
-    title_lines = text_to_ansi_art(title, max_width=999999)  # Don't truncate, we'll scroll instead
-    
-    # Check if scrolling is needed
-    title_width = len(title_lines[0]) if title_lines else 0
-    max_title_width = WidgetConfig.get_title_max_width()
-    needs_scroll = title_width > max_title_width
-    
-    if needs_scroll:
-        # Apply horizontal scroll by slicing each line
-        scrolled_lines = []
-        for line in title_lines:
-            # Add some spacing at the end and loop around
-            extended_line = line + "     " + line  # Add spacing then repeat for seamless loop
-            visible_part = extended_line[scroll_offset:scroll_offset + max_title_width]
-            scrolled_lines.append(visible_part)
-        title_lines = scrolled_lines
+    if title_strip is None or title_strip.text != title:
+        title_strip = TitleStrip(title)
+    title_lines = title_strip.view(scroll_offset, WidgetConfig.get_title_max_width())
     
     for line in title_lines:
         info_lines.append(f"{Colors.BOLD}{Colors.SUCCESS}{line}{Colors.ENDC}")
@@ -469,6 +471,11 @@ async def send_to_websocket(data):
     if USE_PROTOCOL:
         return False
     
+    # Daemon mode: queued for every LedFx instance, each sent at its own pace
+    if fanout is not None:
+        fanout.publish(data)
+        return True
+    
     if not ws_connection:
         return False
     
@@ -488,19 +495,9 @@ async def send_to_websocket(data):
         ws_connection = None
         return False
 
-def parse_time_value(value):
-    """Parse time values that may have 's' suffix (e.g., '5081.3s' -> 5081.3)"""
-    if value is None:
-        return None
-    if isinstance(value, str):
-        return float(value.rstrip('s'))
-    return float(value)
-
 # Platform-specific imports
 if platform.system() == "Windows":
-    from winsdk.windows.media.control import \
-        GlobalSystemMediaTransportControlsSessionManager as MediaManager
-    from winsdk.windows.storage.streams import DataReader
+    import smtc_session
 elif platform.system() == "Linux":
     try:
         import dbus
@@ -508,51 +505,29 @@ elif platform.system() == "Linux":
         print("⚠️  dbus-python not installed. Install with: pip install dbus-python")
         sys.exit(1)
 elif platform.system() == "Darwin":
-    # macOS - uses subprocess for AppleScript, no additional imports needed
-    pass
+    import macos_media_stream
+
+# Event-driven SMTC session, created on first use and kept for the process
+_smtc_provider = None
+# macOS now-playing stream, likewise; False once it turned out unavailable
+_macos_stream = None
 
 async def get_windows_media_info():
-    """Get current media info on Windows using WinSDK - WITH POSITION TRACKING"""
-    sessions = await MediaManager.request_async()
-    current_session = sessions.get_current_session()
-    if current_session:
-        info = await current_session.try_get_media_properties_async()
-        
-        # Get timeline properties for position tracking
-        timeline = current_session.get_timeline_properties()
-        playback_info = current_session.get_playback_info()
-        
-        # Get thumbnail/album art
-        thumbnail_path = None
-        if info.thumbnail:
-            try:
-                thumb_stream = await info.thumbnail.open_read_async()
-                reader = DataReader(thumb_stream)
-                await reader.load_async(thumb_stream.size)
-                
-                # Save thumbnail to LedFx assets directory
-                appdata = Path(os.getenv('APPDATA'))
-                assets_dir = appdata / ".ledfx" / "assets"
-                assets_dir.mkdir(parents=True, exist_ok=True)
-                thumbnail_path = assets_dir / "current_album_art.jpg"
-                
-                buffer = reader.read_buffer(thumb_stream.size)
-                with open(thumbnail_path, 'wb') as f:
-                    f.write(bytearray(buffer))
-                
-                reader.close()
-                thumb_stream.close()
-            except Exception as e:
-                print(f"Failed to save album art: {e}")
-        
+    """Get current media info on Windows from the cached SMTC session - WITH POSITION TRACKING"""
+    global _smtc_provider
+    if _smtc_provider is None:
+        _smtc_provider = await smtc_session.start_windows_provider(smtc_session.save_windows_thumbnail)
+    
+    info = _smtc_provider.state
+    if info:
         # Match song-detector-plus.py logic: always split title on ' - ' if present
-        title_raw = info.title or "Unknown"
+        title_raw = info["title"] or "Unknown"
         if ' - ' in title_raw:
             parts = title_raw.split(' - ', 1)
             artist = parts[0].strip()
             title = parts[1].strip()
         else:
-            artist = (info.artist or "Unknown").strip()
+            artist = (info["artist"] or "Unknown").strip()
             title = title_raw.strip()
         # Clean up YouTube Music "Topic" artist suffix
         if artist.endswith(' - Topic'):
@@ -560,31 +535,16 @@ async def get_windows_media_info():
         artist = artist.strip(' -')
         title = title.strip(' -')
         
-        # Extract position and duration
-        position_seconds = None
-        duration_seconds = None
-        is_playing = False
-        
-        if timeline:
-            if hasattr(timeline, 'position') and timeline.position is not None:
-                position_seconds = timeline.position.total_seconds()
-            if hasattr(timeline, 'end_time') and timeline.end_time is not None and \
-               hasattr(timeline, 'start_time') and timeline.start_time is not None:
-                duration_seconds = (timeline.end_time - timeline.start_time).total_seconds()
-        
-        if playback_info:
-            playback_status = playback_info.playback_status
-            is_playing = (playback_status == 4)  # 4 = Playing
-        
         return {
             "title": title,
             "artist": artist,
-            "album": info.album_title if info.album_title else "",
-            "thumbnail": str(thumbnail_path) if thumbnail_path else None,
-            "position": position_seconds,
-            "duration": duration_seconds,
-            "playing": is_playing,
-            "timestamp": time.time()
+            "album": info["album"],
+            "thumbnail": info["thumbnail"],
+            "position": info["position"],
+            "duration": info["duration"],
+            "playing": info["playing"],
+            # When the position was sampled, not when we asked for it
+            "timestamp": info["timestamp"]
         }
     return None
 
@@ -678,16 +638,7 @@ def get_linux_media_info():
 
 def get_macos_media_info():
     """Get current media info on macOS - WITH POSITION TRACKING (if available)"""
-    
-    # Helper function to get script directory (works with PyInstaller)
-    def get_resource_path(relative_path):
-        """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            # PyInstaller creates a temp folder and stores path in _MEIPASS
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-        return os.path.join(base_path, relative_path)
+    global _macos_stream
     
     def save_artwork(artwork_data):
         """Save base64-encoded artwork to file"""
@@ -716,137 +667,81 @@ def get_macos_media_info():
             return None
     
     try:
-        media_info = None
+        if _macos_stream is None:
+            _macos_stream = macos_media_stream.start_macos_stream() or False
         
-        # Strategy 1: Try system-installed media-control (if available)
-        if shutil.which('media-control'):
-            try:
-                result = subprocess.run(
-                    ['media-control', 'get'],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                
-                if result.returncode == 0 and result.stdout.strip():
-                    data = json.loads(result.stdout.strip())
-                    if data and data.get('playing') and data.get('title'):
-                        thumbnail_path = None
-                        if data.get('artworkData'):
-                            thumbnail_path = save_artwork(data['artworkData'])
-                        
-                        # Match song-detector-plus.py logic: always split title on ' - ' if present
-                        title_raw = data.get('title', 'Unknown')
-                        if ' - ' in title_raw:
-                            parts = title_raw.split(' - ', 1)
-                            artist = parts[0].strip()
-                            title = parts[1].strip()
-                        else:
-                            artist = (data.get('artist', 'Unknown') or 'Unknown').strip()
-                            title = title_raw.strip()
-                        if artist.endswith(' - Topic'):
-                            artist = artist[:-8].strip()
-                        artist = artist.strip(' -')
-                        title = title.strip(' -')
-                        # Parse ISO timestamp or use current time
-                        timestamp_str = data.get('timestamp')
-                        if timestamp_str:
-                            try:
-                                from dateutil.parser import parse as parse_iso
-                                timestamp = parse_iso(timestamp_str).timestamp()
-                            except ImportError:
-                                timestamp = time.time()
-                        else:
-                            timestamp = time.time()
-                        media_info = {
-                            "title": title,
-                            "artist": artist,
-                            "album": data.get('album', ''),
-                            "thumbnail": thumbnail_path,
-                            "position": parse_time_value(data.get('elapsedTime')),
-                            "duration": parse_time_value(data.get('duration')),
-                            "playing": data.get('playing', False),
-                            "timestamp": timestamp,
-                            "content_id": data.get('contentItemIdentifier')
-                        }
-            except Exception as e:
-                print(f"media-control failed: {e}")
-        
-        # Strategy 2: Use bundled mediaremote-adapter framework
-        if not media_info:
-            try:
-                framework_path = get_resource_path('MediaRemoteAdapter.framework')
-                perl_script = get_resource_path('mediaremote-adapter.pl')
-                
-                if os.path.exists(framework_path) and os.path.exists(perl_script):
-                    result = subprocess.run(
-                        ['/usr/bin/perl', perl_script, framework_path, 'get'],
-                        capture_output=True,
-                        text=True,
-                        timeout=2
-                    )
-                    
-                    if result.returncode == 0 and result.stdout.strip():
-                        data = json.loads(result.stdout.strip())
-                        if data and data.get('playing') and data.get('title'):
-                            thumbnail_path = None
-                            if data.get('artworkData'):
-                                thumbnail_path = save_artwork(data['artworkData'])
-                            
-                            # Match song-detector-plus.py logic: always split title on ' - ' if present
-                            title_raw = data.get('title', 'Unknown')
-                            if ' - ' in title_raw:
-                                parts = title_raw.split(' - ', 1)
-                                artist = parts[0].strip()
-                                title = parts[1].strip()
-                            else:
-                                artist = (data.get('artist', 'Unknown') or 'Unknown').strip()
-                                title = title_raw.strip()
-                            if artist.endswith(' - Topic'):
-                                artist = artist[:-8].strip()
-                            artist = artist.strip(' -')
-                            title = title.strip(' -')
-                            # Parse ISO timestamp or use current time
-                            timestamp_str = data.get('timestamp')
-                            if timestamp_str:
-                                try:
-                                    from dateutil.parser import parse as parse_iso
-                                    timestamp = parse_iso(timestamp_str).timestamp()
-                                except ImportError:
-                                    timestamp = time.time()
-                            else:
-                                timestamp = time.time()
-                            media_info = {
-                                "title": title,
-                                "artist": artist,
-                                "album": data.get('album', ''),
-                                "thumbnail": thumbnail_path,
-                                "position": parse_time_value(data.get('elapsedTime')),
-                                "duration": parse_time_value(data.get('duration')),
-                                "playing": data.get('playing', False),
-                                "timestamp": timestamp,
-                                "content_id": data.get('contentItemIdentifier')
-                            }
-            except Exception as e:
-                print(f"bundled mediaremote-adapter failed: {e}")
+        # Serve from the stream; a one-shot get only if it can't run
+        if _macos_stream and _macos_stream.alive:
+            data = _macos_stream.current()
+        else:
+            data = macos_media_stream.read_once()
         
-        return media_info
+        if data and data.get('playing') and data.get('title'):
+            thumbnail_path = None
+            if data.get('artworkData'):
+                thumbnail_path = save_artwork(data['artworkData'])
+            
+            # Match song-detector-plus.py logic: always split title on ' - ' if present
+            title_raw = data.get('title', 'Unknown')
+            if ' - ' in title_raw:
+                parts = title_raw.split(' - ', 1)
+                artist = parts[0].strip()
+                title = parts[1].strip()
+            else:
+                artist = (data.get('artist', 'Unknown') or 'Unknown').strip()
+                title = title_raw.strip()
+            if artist.endswith(' - Topic'):
+                artist = artist[:-8].strip()
+            artist = artist.strip(' -')
+            title = title.strip(' -')
+            
+            # elapsedTime is the position at "timestamp", which for a cached
+            # state can be well before now
+            timestamp = macos_media_stream.timestamp_seconds(data.get('timestamp')) or time.time()
+            
+            return {
+                "title": title,
+                "artist": artist,
+                "album": data.get('album', ''),
+                "thumbnail": thumbnail_path,
+                "position": parse_time_value(data.get('elapsedTime')),
+                "duration": parse_time_value(data.get('duration')),
+                "playing": data.get('playing', False),
+                "timestamp": timestamp,
+                "content_id": data.get('contentItemIdentifier')
+            }
+        return None
         
     except Exception as e:
         print(f"Failed to get media info: {e}")
         return None
 
+async def wait_for_media_change():
+    """Wait for the next chance of a media change
+    
+    The SMTC session is event-driven and positions are extrapolated from
+    their anchors, so Windows only wakes on real changes (with a slow resync
+    as a safety net). MPRIS is still polled once a second.
+    """
+    if platform.system() == "Windows" and _smtc_provider is not None:
+        await _smtc_provider.wait_for_change(timeout=30)
+    else:
+        await asyncio.sleep(1)
+
 async def get_current_media_info():
     """Get current media info (OS-aware)"""
     if platform.system() == "Windows":
-        return await get_windows_media_info()
+        info, source = await get_windows_media_info(), 'smtc'
     elif platform.system() == "Linux":
-        return get_linux_media_info()
+        info, source = get_linux_media_info(), 'mpris'
     elif platform.system() == "Darwin":
-        return get_macos_media_info()
+        info, source = get_macos_media_info(), 'macos'
     else:
         print(f"⚠️  Unsupported OS: {platform.system()}")
         return None
+    if recorder is not None:
+        recorder.record(source, info)
+    return info
 
 def send_media_info(info, device_name):
     """Send media info via protocol handler - WITH POSITION DATA"""
@@ -898,58 +793,51 @@ def send_media_info(info, device_name):
     else:
         print(f"{info['artist']} - {info['title']}")
 
-def should_send_update(current, previous):
-    """Determine if we should send an update based on state changes"""
-    if previous is None:
-        return True
-    
-    # Track changed (use content_id for robust detection)
-    curr_content_id = current.get('content_id')
-    prev_content_id = previous.get('content_id')
-    if curr_content_id and prev_content_id and curr_content_id != prev_content_id:
-        return True
-    
-    # Fallback: Track changed (title/artist comparison)
-    if current['title'] != previous['title'] or current['artist'] != previous['artist']:
-        return True
-    
-    # Playback state changed (play/pause)
-    if current.get('playing') != previous.get('playing'):
-        return True
-    
-    # Artwork changed
-    if current.get('thumbnail') != previous.get('thumbnail'):
-        return True
-    
-    # Position jumped significantly (seek detected)
-    curr_pos = current.get('position')
-    prev_pos = previous.get('position')
-    if curr_pos is not None and prev_pos is not None:
-        # If position jumped more than 2 seconds (accounting for polling delay)
-        time_diff = current.get('timestamp', 0) - previous.get('timestamp', 0)
-        expected_pos = prev_pos + (time_diff if previous.get('playing') else 0)
-        if abs(curr_pos - expected_pos) > 2.0:
-            return True
-    
-    return False
-
 async def monitor_media_info_terminal():
     """Monitor and display media info in terminal only"""
+    # Redraws between polls take the position from the playback clock
+    screen = ScreenBuffer()
+    clock = PlaybackClock()
+    last_track_id = None
+    info = None
+    has_position = False
+    next_poll = 0.0
+    
     try:
         while True:
-            # Clear screen for fresh display
-            print("\033[2J\033[H", end="")
-            
-            info = await get_current_media_info()
-            if info:
-                display_media_info_terminal(info)
-            else:
-                print(f"\n{Colors.TEXT_DIM}{Colors.TEXT_PRIMARY}[ NO SIGNAL DETECTED ]{Colors.ENDC}")
-                print(f"{Colors.TEXT_DIM}{Colors.TEXT_PRIMARY}[{time.strftime('%H:%M:%S')}]{Colors.ENDC} {Colors.WARNING}●{Colors.ENDC} {Colors.TEXT_DIM}AWAITING MEDIA...{Colors.ENDC}\n")
+            with screen.frame():
+                if time.monotonic() >= next_poll:
+                    next_poll = time.monotonic() + MEDIA_POLL_INTERVAL
+                    info = await get_current_media_info()
+                    if info:
+                        current_track_id = f"{info.get('artist', '')}-{info.get('title', '')}"
+                        if current_track_id != last_track_id:
+                            last_track_id = current_track_id
+                            clock.reset()
+                        has_position = info.get('position') is not None
+                        clock.update(
+                            info.get('position'),
+                            info.get('playing'),
+                            info.get('timestamp'),
+                            info.get('duration'),
+                        )
+                    else:
+                        last_track_id = None
+                        clock.reset()
+                
+                if info:
+                    if has_position:
+                        info['position'] = clock.position()
+                    display_media_info_terminal(info)
+                else:
+                    print(f"\n{Colors.TEXT_DIM}{Colors.TEXT_PRIMARY}[ NO SIGNAL DETECTED ]{Colors.ENDC}")
+                    print(f"{Colors.TEXT_DIM}{Colors.TEXT_PRIMARY}[{time.strftime('%H:%M:%S')}]{Colors.ENDC} {Colors.WARNING}●{Colors.ENDC} {Colors.TEXT_DIM}AWAITING MEDIA...{Colors.ENDC}\n")
             
-            await asyncio.sleep(1)
+            await asyncio.sleep(REDRAW_INTERVAL)
     except asyncio.CancelledError:
         pass
+    finally:
+        screen.close()
 
 async def monitor_media_info_terminal_plus():
     """Monitor and display media info in terminal with album art - TERMINAL PLUS MODE"""
@@ -962,67 +850,88 @@ async def monitor_media_info_terminal_plus():
     # Clear screen once before starting
     os.system('cls' if os.name == 'nt' else 'clear')
     
-    # Track start time to calculate elapsed time when position isn't updating
+    # Position between samples comes from the playback clock, so the
+    # progress bar keeps moving even when the API position isn't updating
     last_track_id = None
-    track_start_time = None
-    track_start_position = None
-    scroll_offset = 0  # For horizontal title scrolling
+    clock = PlaybackClock()
+    scroll_started = time.monotonic()  # For horizontal title scrolling
+    screen = ScreenBuffer()
+    info = None
+    next_poll = 0.0
+    
+    # Render the album art for a new terminal width as soon as the window is
+    # resized, so the next redraw finds it cached (no SIGWINCH on Windows,
+    # where the next redraw renders it instead)
+    loop = asyncio.get_running_loop()
+    resize_signal = getattr(signal, 'SIGWINCH', None) if PIL_AVAILABLE else None
+    if resize_signal is not None:
+        loop.add_signal_handler(
+            resize_signal,
+            lambda: loop.run_in_executor(
+                None, album_art_cache.prerender, WidgetConfig.get_album_art_width()
+            ),
+        )
     
     try:
         while True:
-            # Clear screen for fresh display
-            print("\033[2J\033[H", end="")
-            
-            info = await get_current_media_info()
-            if info:
-                # Track ID for detecting song changes
-                current_track_id = f"{info.get('artist', '')}-{info.get('title', '')}"
-                
-                # If track changed, reset timing and scroll
-                if current_track_id != last_track_id:
-                    last_track_id = current_track_id
-                    track_start_time = time.time()
-                    track_start_position = info.get('position', 0) or 0
-                    scroll_offset = 0  # Reset scroll for new track
+            with screen.frame():
+                if time.monotonic() >= next_poll:
+                    next_poll = time.monotonic() + MEDIA_POLL_INTERVAL
+                    info = await get_current_media_info()
+                    if info:
+                        # Track ID for detecting song changes
+                        current_track_id = f"{info.get('artist', '')}-{info.get('title', '')}"
+                        
+                        # If track changed, reset timing and scroll
+                        if current_track_id != last_track_id:
+                            last_track_id = current_track_id
+                            clock.reset()
+                            scroll_started = time.monotonic()
+                        
+                        # Players that don't report position send 0 - treat that as
+                        # "no sample" so the clock keeps counting from track start
+                        clock.update(
+                            info.get('position') or None,
+                            info.get('playing'),
+                            info.get('timestamp'),
+                            info.get('duration'),
+                        )
+                    else:
+                        last_track_id = None
+                        clock.reset()
                 
-                # If position isn't updating from API and track is playing, calculate manually
-                if info.get('playing') and track_start_time is not None:
-                    elapsed = time.time() - track_start_time
-                    calculated_position = track_start_position + elapsed
+                if info:
+                    info['position'] = clock.position()
                     
-                    # Use calculated position if API position is 0 or not updating
-                    api_position = info.get('position', 0) or 0
-                    if api_position == 0 or abs(api_position - calculated_position) > 5:
-                        info['position'] = calculated_position
-                
-                # Render album art and get lines
-                artwork_lines = None
-                if PIL_AVAILABLE and os.path.exists(artwork_path):
+                    # Album art lines, from the cache unless the artwork or the
+                    # terminal width changed
                     artwork_lines = render_album_art_ansi(artwork_path)
-                
-                # Display side-by-side widget with scroll
-                display_player_widget(info, artwork_lines, scroll_offset)
-                
-                # Increment scroll offset for next frame (2 chars per update for smooth scroll)
-                scroll_offset += 3
-            else:
-                print(f"\n{Colors.TEXT_DIM}{Colors.TEXT_PRIMARY}[ NO SIGNAL DETECTED ]{Colors.ENDC}")
-                print(f"{Colors.TEXT_DIM}{Colors.TEXT_PRIMARY}[{time.strftime('%H:%M:%S')}]{Colors.ENDC} {Colors.WARNING}●{Colors.ENDC} {Colors.TEXT_DIM}AWAITING MEDIA...{Colors.ENDC}\n")
-                last_track_id = None
-                track_start_time = None
+                    
+                    # Display side-by-side widget, the title scrolling at a
+                    # steady speed whatever the redraw rate
+                    scroll_offset = int((time.monotonic() - scroll_started) * TITLE_SCROLL_SPEED)
+                    display_player_widget(info, artwork_lines, scroll_offset)
+                else:
+                    print(f"\n{Colors.TEXT_DIM}{Colors.TEXT_PRIMARY}[ NO SIGNAL DETECTED ]{Colors.ENDC}")
+                    print(f"{Colors.TEXT_DIM}{Colors.TEXT_PRIMARY}[{time.strftime('%H:%M:%S')}]{Colors.ENDC} {Colors.WARNING}●{Colors.ENDC} {Colors.TEXT_DIM}AWAITING MEDIA...{Colors.ENDC}\n")
             
-            await asyncio.sleep(1)
+            await asyncio.sleep(REDRAW_INTERVAL)
     except asyncio.CancelledError:
         pass
+    finally:
+        screen.close()
+        if resize_signal is not None:
+            loop.remove_signal_handler(resize_signal)
 
 async def monitor_media_info(device_name):
-    # Connect to LedFx WebSocket only in Core mode (not in CC mode)
-    if not USE_PROTOCOL:
+    # Connect to LedFx WebSocket only in Core mode (not in CC mode); the
+    # daemon has a connection per endpoint already
+    if not USE_PROTOCOL and fanout is None:
         await connect_to_ledfx()
     
     if platform.system() == "Darwin":
         # macOS: Use streaming mode for real-time updates
-        monitor_media_info_macos_stream(device_name)
+        await monitor_media_info_macos_stream(device_name)
     else:
         # Windows/Linux: Poll every second
         previous_info = None
@@ -1036,27 +945,47 @@ async def monitor_media_info(device_name):
                         # Also send to WebSocket if connected
                         await send_to_websocket(info)
                     else:
-                        send_media_info({"artist": "Unknown", "title": "No media is currently playing"}, device_name)
+                        send_media_info(NO_MEDIA, device_name)
                     previous_info = info
                 elif info:
                     # Update internal state even if not sending
                     previous_info = info
                     
-                await asyncio.sleep(1)
+                await wait_for_media_change()
         except asyncio.CancelledError:
             print(f"{Colors.TEXT_DIM}System terminated{Colors.ENDC}")
 
-def monitor_media_info_macos_stream(device_name):
+async def report_fanout_health():
+    """Print the state of every daemon endpoint now and then"""
+    while True:
+        await asyncio.sleep(HEALTH_INTERVAL)
+        print(f"{Colors.TEXT_DIM}{Colors.TEXT_PRIMARY}[{time.strftime('%H:%M:%S')}]{Colors.ENDC} {Colors.TEXT_DIM}{fanout.published} updates published{Colors.ENDC}")
+        for endpoint in fanout.health():
+            state = f"{Colors.SUCCESS}●{Colors.ENDC}" if endpoint['connected'] else f"{Colors.ERROR}○{Colors.ENDC}"
+            send_ms = f"{endpoint['last_send_ms']:.1f}" if endpoint['last_send_ms'] is not None else "-"
+            line = (f"  {state} {endpoint['url']} {Colors.TEXT_DIM}sent {endpoint['sent']}, dropped {endpoint['dropped']}, "
+                    f"queued {endpoint['queued']}, connects {endpoint['connects']}, failures {endpoint['failures']}, "
+                    f"send {send_ms}/{endpoint['max_send_ms']:.1f} ms{Colors.ENDC}")
+            if endpoint['last_error'] and not endpoint['connected']:
+                line += f" {Colors.WARNING}{endpoint['last_error']}{Colors.ENDC}"
+            print(line)
+
+async def monitor_media_info_daemon(device_name, endpoints):
+    """Read the media session once and publish to every LedFx endpoint"""
+    global fanout
+    fanout = FanOut(endpoints)
+    fanout.start()
+    health = asyncio.create_task(report_fanout_health())
+    try:
+        await monitor_media_info(device_name)
+    finally:
+        health.cancel()
+        await fanout.stop()
+        fanout = None
+
+async def monitor_media_info_macos_stream(device_name):
     """Monitor media info on macOS using stream mode for real-time updates"""
     
-    def get_resource_path(relative_path):
-        """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-        return os.path.join(base_path, relative_path)
-    
     def save_artwork(artwork_data):
         """Save base64-encoded artwork to file"""
         if not artwork_data:
@@ -1081,202 +1010,61 @@ def monitor_media_info_macos_stream(device_name):
             traceback.print_exc()
             return None
     
+    # System media-control first, then the bundled mediaremote-adapter
+    command = macos_media_stream.stream_command()
+    if not command:
+        print("⚠️  No media-control method available on macOS")
+        return
+    
+    loop = asyncio.get_running_loop()
     previous_info = None
-    process = None
+    messages = macos_media_stream.stream_messages(command)
     
     try:
-        # Try system media-control first
-        if shutil.which('media-control'):
-            process = subprocess.Popen(
-                ['media-control', 'stream'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
-        else:
-            # Use bundled mediaremote-adapter
-            framework_path = get_resource_path('MediaRemoteAdapter.framework')
-            perl_script = get_resource_path('mediaremote-adapter.pl')
-            
-            if os.path.exists(framework_path) and os.path.exists(perl_script):
-                process = subprocess.Popen(
-                    ['/usr/bin/perl', perl_script, framework_path, 'stream'],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
-                )
-        
-        if not process:
-            print("⚠️  No media-control method available on macOS")
-            return
-        
-        # Read streaming output line by line
-        for line in process.stdout:
+        # Messages are decoded as the process prints them, and artwork files
+        # and the protocol handler go to the thread pool, so the event loop
+        # (and the LedFx WebSocket on it) never waits for the stream
+        async for data in messages:
             try:
-                line = line.strip()
-                if not line:
+                if recorder is not None:
+                    recorder.record('media-control', data)
+                
+                kind = stream_message_kind(data)
+                if kind == 'stopped':
+                    # Only send "no media" notification once when transitioning from playing
+                    if previous_info is not None and previous_info.get('playing'):
+                        await loop.run_in_executor(None, send_media_info, NO_MEDIA, device_name)
+                        previous_info = None
+                    continue
+                if kind != 'update':
                     continue
                 
-                data = json.loads(line)
+                thumbnail_path = None
+                if data['payload'].get('artworkData'):
+                    thumbnail_path = await loop.run_in_executor(None, save_artwork, data['payload']['artworkData'])
                 
-                # Check if it's a data payload (stream outputs multiple types)
-                if data.get('type') == 'data':
-                    payload = data.get('payload', {})
-                    
-                    # Skip empty payloads completely
-                    if not payload:
-                        continue
-                    
-                    # Check if media stopped playing
-                    # BUT: Only if 'playing' field is explicitly present (diff:true may omit it)
-                    if 'playing' in payload and not payload.get('playing'):
-                        # Only send "no media" notification once when transitioning from playing
-                        if previous_info is not None and previous_info.get('playing'):
-                            send_media_info({"artist": "Unknown", "title": "No media is currently playing"}, device_name)
-                            previous_info = None
-                        continue
-                    
-                    # Early filter: ignore if no title AND not a diff:true event
-                    # (diff:true events may contain only artwork)
-                    if not payload.get('title') and not data.get('diff'):
-                        continue
-                    
-                    # Parse artist
-                    artist = payload.get('artist', 'Unknown')
-                    if artist.endswith(' - Topic'):
-                        artist = artist[:-8].strip()
-                    
-                    # Parse ISO timestamp or use current time
-                    timestamp_str = payload.get('timestamp')
-                    if timestamp_str:
-                        try:
-                            from dateutil.parser import parse as parse_iso
-                            timestamp = parse_iso(timestamp_str).timestamp()
-                        except ImportError:
-                            timestamp = time.time()
-                    else:
-                        timestamp = time.time()
-                    
-                    # Build media_info - merge with previous to handle diff:true events
-                    # BUT: Don't merge if track changed (different title/artist)
-                    should_merge = False
-                    if previous_info and data.get('diff'):
-                        # Check if track changed before merging
-                        prev_title = previous_info.get('title', '')
-                        prev_artist = previous_info.get('artist', '')
-                        curr_title = payload.get('title', prev_title)  # Use prev if not in payload
-                        curr_artist = artist if artist != 'Unknown' else previous_info.get('artist', '')
-                        
-                        # Only merge if same track (title/artist unchanged)
-                        if curr_title == prev_title and curr_artist == prev_artist:
-                            should_merge = True
-                    
-                    if should_merge:
-                        # diff:true - merge update with previous state (SAME track)
-                        media_info = previous_info.copy()
-                        
-                        # Handle artwork if present in diff
-                        if payload.get('artworkData'):
-                            thumbnail_path = save_artwork(payload['artworkData'])
-                            media_info['thumbnail'] = thumbnail_path
-                        
-                        # Update only fields that are present in payload
-                        if 'title' in payload:
-                            media_info['title'] = payload['title']
-                        if artist != 'Unknown':
-                            media_info['artist'] = artist
-                        if 'album' in payload:
-                            media_info['album'] = payload.get('album', '')
-                        if 'elapsedTime' in payload:
-                            media_info['position'] = parse_time_value(payload['elapsedTime'])
-                        if 'duration' in payload:
-                            media_info['duration'] = parse_time_value(payload['duration'])
-                        if 'playing' in payload:
-                            media_info['playing'] = payload['playing']
-                        if timestamp_str:
-                            media_info['timestamp'] = timestamp
-                        if 'contentItemIdentifier' in payload:
-                            media_info['content_id'] = payload['contentItemIdentifier']
-                    else:
-                        # diff:false or no previous - full update
-                        # Handle artwork
-                        thumbnail_path = None
-                        if payload.get('artworkData'):
-                            thumbnail_path = save_artwork(payload['artworkData'])
-                        
-                        media_info = {
-                            "title": payload.get('title', 'Unknown'),
-                            "artist": artist,
-                            "album": payload.get('album', ''),
-                            "thumbnail": thumbnail_path,
-                            "position": parse_time_value(payload.get('elapsedTime')),
-                            "duration": parse_time_value(payload.get('duration')),
-                            "playing": payload.get('playing', False),
-                            "timestamp": timestamp,
-                            "content_id": payload.get('contentItemIdentifier')
-                        }
-                    
-                    # Detect track change
-                    track_changed = False
-                    if previous_info:
-                        prev_title = previous_info.get('title', '')
-                        prev_artist = previous_info.get('artist', '')
-                        prev_content_id = previous_info.get('content_id')
-                        
-                        curr_title = media_info.get('title', '')
-                        curr_artist = media_info.get('artist', '')
-                        curr_content_id = media_info.get('content_id')
-                        
-                        # Track changed if title/artist/contentId different
-                        if (curr_title != prev_title or 
-                            curr_artist != prev_artist or 
-                            (curr_content_id and prev_content_id and curr_content_id != prev_content_id)):
-                            track_changed = True
-                    
-                    # On track change: reset position to 0 and clear old duration
-                    if track_changed:
-                        media_info['position'] = 0
-                        # Don't inherit old track's duration if new track has no duration
-                        if media_info.get('duration', 0) == 0:
-                            media_info['duration'] = 0
-                    
-                    # Calculate position based on timestamp (if playing and timestamp available)
-                    if media_info.get('playing') and media_info.get('timestamp'):
-                        elapsed_since_timestamp = time.time() - media_info['timestamp']
-                        base_position = media_info.get('position', 0) or 0
-                        calculated_position = base_position + elapsed_since_timestamp
-                        media_info['position'] = calculated_position
-                    
-                    # Only send if position < duration (skip if at end)
-                    # But allow 0 duration (unknown duration case)
-                    duration = media_info.get('duration')
-                    position = media_info.get('position')
-                    
-                    if duration and position and duration > 0 and position >= duration:
-                        # Track at end, skip sending
-                        previous_info = media_info
-                        continue
-                    
-                    if should_send_update(media_info, previous_info):
-                        send_media_info(media_info, device_name)
-                        previous_info = media_info
-                    else:
-                        previous_info = media_info
+                # Diff merge, track change and position, see media_updates
+                media_info = merge_stream_payload(previous_info, data, thumbnail_path)
+                
+                # Only send if position < duration (skip if at end)
+                if at_track_end(media_info):
+                    previous_info = media_info
+                    continue
+                
+                if should_send_update(media_info, previous_info):
+                    await loop.run_in_executor(None, send_media_info, media_info, device_name)
+                    # Also send to WebSocket if connected
+                    await send_to_websocket(media_info)
+                previous_info = media_info
                 
-            except json.JSONDecodeError:
-                continue
             except Exception as e:
                 print(f"{Colors.ERROR}✖ Stream error:{Colors.ENDC} {Colors.TEXT_DIM}{e}{Colors.ENDC}")
                 continue
         
-    except KeyboardInterrupt:
+    except asyncio.CancelledError:
         print(f"\n{Colors.SUCCESS}✓ SYSTEM TERMINATED{Colors.ENDC} {Colors.TEXT_DIM}- Session ended{Colors.ENDC}")
     finally:
-        if process:
-            process.terminate()
-            process.wait()
+        await messages.aclose()
 
 def show_menu(show_core_mode=False):
     """Display menu and return user selection"""
@@ -1318,8 +1106,37 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Send media info with position tracking to a virtual device.")
     parser.add_argument("--device_name", type=str, help="The name of the virtual device to send the info to.")
     parser.add_argument("--core", action="store_true", help="Show advanced LedFx Core mode option in menu")
+    parser.add_argument("--daemon", action="store_true", help="Skip the menu and publish to every --endpoint (LedFx Core WebSocket)")
+    parser.add_argument("--endpoint", action="append", dest="endpoints", metavar="URL",
+                        help="LedFx WebSocket for --daemon, repeat for several instances (default: ws://localhost:8888/api/websocket)")
+    parser.add_argument("--record", metavar="FILE",
+                        help="Append every media sample to FILE (JSON lines) for tools/benchmarks/replay_media_session.py")
     args = parser.parse_args()
     
+    if args.record:
+        recorder = SessionRecorder(args.record)
+        atexit.register(recorder.close)
+        print(f"{Colors.TEXT_DIM}Recording media samples to {args.record}{Colors.ENDC}")
+    
+    if args.daemon:
+        # Daemon mode - one media session, every LedFx instance
+        if not WEBSOCKETS_AVAILABLE:
+            print(f"{Colors.ERROR}✖ Daemon mode needs websockets{Colors.ENDC} {Colors.TEXT_DIM}- pip install websockets{Colors.ENDC}")
+            sys.exit(1)
+        endpoints = args.endpoints or ["ws://localhost:8888/api/websocket"]
+        print(f"\n{Colors.SEPARATOR}{'▬' * 60}{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.SECONDARY}▸{Colors.ENDC} BLADE SONG DETECTOR - {Colors.SUCCESS}Daemon{Colors.ENDC} {Colors.TEXT_DIM}(WebSocket Fan-out){Colors.ENDC}")
+        for endpoint in endpoints:
+            print(f"{Colors.TEXT_DIM}  → {endpoint}{Colors.ENDC}")
+        print(f"{Colors.SEPARATOR}{'▬' * 60}{Colors.ENDC}\n")
+        print(f"{Colors.TEXT_DIM}OS: {platform.system()}{Colors.ENDC}")
+        print(f"{Colors.TEXT_DIM}Monitoring media... Press {Colors.SECONDARY}Ctrl+C{Colors.TEXT_DIM} to stop{Colors.ENDC}\n")
+        try:
+            asyncio.run(monitor_media_info_daemon(args.device_name or "ledfxcc", endpoints))
+        except KeyboardInterrupt:
+            print(f"\n{Colors.SUCCESS}✓ SYSTEM TERMINATED{Colors.ENDC} {Colors.TEXT_DIM}- User interrupt{Colors.ENDC}")
+        sys.exit(0)
+    
     # Show menu and get user choice
     choice = show_menu(show_core_mode=args.core)
     
@@ -0,0 +1,199 @@
+"""
+LedFx fan-out - one media session, several LedFx instances
+
+blade-song-detector.py talks to a single ws://localhost:8888/api/websocket,
+so a rig with one LedFx per stage needed a detector per instance, each
+polling the OS media session on its own. In daemon mode the detector reads
+the session once and FanOut publishes each song_info message to every
+configured endpoint concurrently.
+
+Every endpoint has its own connection task and a small bounded queue:
+
+  backpressure  a slow or unreachable instance never holds up the session
+                reader or the other endpoints. Messages are complete
+                song_info snapshots, so when a queue is full the oldest one
+                is dropped; the newest state always gets through.
+  reconnect     a failed or lost connection is retried with exponential
+                backoff (RECONNECT_MIN up to RECONNECT_MAX seconds). On
+                connecting, the endpoint is sent the latest state, so an
+                instance that restarts picks up the current song at once;
+                anything queued while it was away is older and is dropped.
+  health        per-endpoint counters (sent, dropped, connects, failures,
+                last error, send time), see FanOut.health().
+
+Connections are made with websockets.connect unless another connect
+coroutine is given, so endpoints can be pointed at local stand-in servers.
+"""
+
+import asyncio
+import json
+import time
+
+# Messages waiting per endpoint before the oldest is dropped
+QUEUE_SIZE = 8
+RECONNECT_MIN = 0.5
+RECONNECT_MAX = 30.0
+CONNECT_TIMEOUT = 5.0
+# A send that takes longer counts as a lost connection
+SEND_TIMEOUT = 5.0
+# How often the daemon prints the health of each endpoint
+HEALTH_INTERVAL = 30.0
+
+
+async def websocket_connect(url):
+    """Open a LedFx WebSocket (needs the websockets package)"""
+    import websockets
+    return await websockets.connect(url, open_timeout=CONNECT_TIMEOUT)
+
+
+def song_info_message(info):
+    """The song_info message LedFx expects, as JSON text"""
+    return json.dumps({"id": 1, "type": "song_info", **info})
+
+
+class Endpoint:
+    """One LedFx instance: its queue, its connection task and its counters"""
+
+    def __init__(self, url, connect=websocket_connect, queue_size=QUEUE_SIZE):
+        self.url = url
+        self._connect = connect
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._latest = None
+        self.connected = False
+        self.stats = {
+            "sent": 0,
+            "dropped": 0,
+            "connects": 0,
+            "failures": 0,
+            "last_error": None,
+            "last_send_ms": None,
+            "max_send_ms": 0.0,
+        }
+
+    def put(self, message):
+        """Queue a message without waiting, dropping the oldest if full"""
+        self._latest = message
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.stats["dropped"] += 1
+        self._queue.put_nowait(message)
+
+    @property
+    def queued(self):
+        return self._queue.qsize()
+
+    async def run(self):
+        """Connect, send, and reconnect on failure, until cancelled"""
+        delay = RECONNECT_MIN
+        while True:
+            try:
+                ws = await self._connect(self.url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed(e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+                continue
+
+            delay = RECONNECT_MIN
+            self.connected = True
+            self.stats["connects"] += 1
+            try:
+                await self._serve(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed(e)
+            finally:
+                self.connected = False
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
+            await asyncio.sleep(delay)
+
+    async def _serve(self, ws):
+        # Whatever LedFx sends (client_id, events) is read and dropped, so
+        # the receive buffer never fills, and a closed socket is noticed
+        # even while there is nothing to send
+        reader = asyncio.create_task(self._drain(ws))
+        get = None
+        try:
+            # A (re)started instance only needs the current song; whatever
+            # queued up while it was away is older than that
+            if self._latest is not None:
+                flushed = 0
+                while not self._queue.empty():
+                    self._queue.get_nowait()
+                    flushed += 1
+                # The last of them, if any, is the latest being sent now
+                self.stats["dropped"] += max(0, flushed - 1)
+                await self._send(ws, self._latest)
+            while True:
+                get = asyncio.create_task(self._queue.get())
+                done, _ = await asyncio.wait(
+                    {get, reader}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if get not in done:
+                    reader.result()
+                    raise ConnectionError("connection closed")
+                await self._send(ws, get.result())
+        finally:
+            reader.cancel()
+            if get is not None:
+                get.cancel()
+
+    async def _drain(self, ws):
+        async for _ in ws:
+            pass
+
+    async def _send(self, ws, message):
+        started = time.perf_counter()
+        await asyncio.wait_for(ws.send(message), SEND_TIMEOUT)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stats["sent"] += 1
+        self.stats["last_send_ms"] = elapsed
+        self.stats["max_send_ms"] = max(self.stats["max_send_ms"], elapsed)
+
+    def _failed(self, error):
+        self.stats["failures"] += 1
+        self.stats["last_error"] = str(error) or type(error).__name__
+
+
+class FanOut:
+    """Publishes song_info to every endpoint, each at its own pace"""
+
+    def __init__(self, urls, connect=websocket_connect, queue_size=QUEUE_SIZE):
+        self.endpoints = [Endpoint(url, connect, queue_size) for url in urls]
+        self._tasks = []
+        self.published = 0
+
+    def start(self):
+        """Start every endpoint's connection task (on the running loop)"""
+        self._tasks = [asyncio.create_task(endpoint.run()) for endpoint in self.endpoints]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def publish(self, info):
+        """Queue info for every endpoint; never waits"""
+        message = song_info_message(info)
+        for endpoint in self.endpoints:
+            endpoint.put(message)
+        self.published += 1
+
+    def health(self):
+        """Per-endpoint state and counters"""
+        return [
+            {
+                "url": endpoint.url,
+                "connected": endpoint.connected,
+                "queued": endpoint.queued,
+                **endpoint.stats,
+            }
+            for endpoint in self.endpoints
+        ]
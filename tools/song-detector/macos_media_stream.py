@@ -0,0 +1,328 @@
+"""
+Long-lived macOS now-playing stream
+
+Every poll of get_macos_media_info() used to spawn `media-control get` (or
+/usr/bin/perl mediaremote-adapter.pl ... get), paying for a process start,
+a Perl interpreter and a MediaRemote round trip each second, and
+song-detector-monitor.py reloaded the framework with ctypes on every call.
+
+MacMediaStream runs the adapter's `stream` mode once, in the background,
+and folds its messages into an in-memory copy of what `get` would print:
+
+  {"type": "data", "diff": false, "payload": {...}}  -> replaces the state
+  {"type": "data", "diff": true,  "payload": {...}}  -> updates the keys given,
+                                                         a null value removes one
+
+A poll is then a dict copy. If the process exits it is started again; if it
+cannot be started at all, or keeps dying before it says anything, the
+stream gives up and callers fall back to read_once().
+
+The stream monitors (monitor_media_info_macos_stream) consume the same
+process from the event loop instead: stream_messages() runs it with
+asyncio.create_subprocess_exec and decodes stdout with JsonLinesParser as
+chunks arrive. Reading by chunk rather than StreamReader.readline() also
+copes with artwork lines, which are far longer than readline()'s 64 KiB
+limit.
+
+Only the command helpers look at macOS; the stream takes any argv and a
+Popen-like (or create_subprocess_exec-like) factory, so it can be driven on
+Linux by a fake producer that prints JSON lines.
+"""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from datetime import datetime
+
+# Wait before starting the stream again after it exited
+RESTART_DELAY = 1.0
+# Exits in a row without a single message before giving up
+MAX_FAILURES = 3
+# How long a first query waits for the stream's initial state
+FIRST_STATE_TIMEOUT = 2.0
+# Bytes per read of the stream's stdout in stream_messages()
+CHUNK_SIZE = 64 * 1024
+
+
+def resource_path(relative_path):
+    """Absolute path to a bundled resource, for dev and for PyInstaller"""
+    base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+
+def adapter_commands(function):
+    """argv for each way to run an adapter function, preferred first
+
+    A system-wide media-control comes first, then the bundled
+    mediaremote-adapter.pl with its framework.
+    """
+    commands = []
+    if shutil.which('media-control'):
+        commands.append(['media-control', function])
+    framework_path = resource_path('MediaRemoteAdapter.framework')
+    perl_script = resource_path('mediaremote-adapter.pl')
+    if os.path.exists(framework_path) and os.path.exists(perl_script):
+        commands.append(['/usr/bin/perl', perl_script, framework_path, function])
+    return commands
+
+
+def stream_command():
+    """argv that streams now-playing updates, or None if there is no adapter"""
+    commands = adapter_commands('stream')
+    return commands[0] if commands else None
+
+
+def read_once(timeout=2):
+    """One-shot `get`, for when no stream can run; the payload dict or None"""
+    for command in adapter_commands('get'):
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+            if result.returncode == 0 and result.stdout.strip():
+                data = json.loads(result.stdout.strip())
+                if data:
+                    return data
+        except Exception as e:
+            print(f"{command[0]} get failed: {e}")
+    return None
+
+
+def timestamp_seconds(value):
+    """Epoch seconds of the adapter's ISO-8601 "timestamp", or None
+
+    "elapsedTime" is the position at that moment, not at the time of the
+    query, so the stream's cached state is only correct with it.
+    """
+    if not value:
+        return None
+    text = value.replace('Z', '+00:00')
+    # fromisoformat() before Python 3.11 takes 0, 3 or 6 fractional digits
+    match = re.match(r'(.*T\d\d:\d\d:\d\d)(?:\.(\d+))?(.*)$', text)
+    if match:
+        fraction = f'.{(match[2] + "000000")[:6]}' if match[2] else ''
+        text = match[1] + fraction + match[3]
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return None
+
+
+def apply_message(state, message):
+    """The state after one stream message; state may be None"""
+    if message.get('type') != 'data':
+        return state
+    payload = message.get('payload') or {}
+    # A diff holds exactly the keys that changed, including on a track
+    # change, so an unchanged artist is simply absent and stays as it was
+    state = dict(state) if message.get('diff') and state else {}
+    for key, value in payload.items():
+        if value is None:
+            state.pop(key, None)
+        else:
+            state[key] = value
+    return state or None
+
+
+class JsonLinesParser:
+    """Incremental decoder for a byte stream of JSON objects, one per line"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.bad_lines = 0
+
+    def feed(self, data):
+        """Objects of every line data completes"""
+        end = data.rfind(b'\n')
+        if end < 0:
+            # Mid-line, e.g. inside artworkData: nothing to parse yet
+            self._buffer += data
+            return []
+        self._buffer += data[:end]
+        lines = self._buffer.split(b'\n')
+        self._buffer = bytearray(data[end + 1:])
+        return self._decode(lines)
+
+    def close(self):
+        """Objects of a last line the stream didn't end with a newline"""
+        lines, self._buffer = [self._buffer], bytearray()
+        return self._decode(lines)
+
+    def _decode(self, lines):
+        messages = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                self.bad_lines += 1
+                continue
+            if isinstance(message, dict):
+                messages.append(message)
+            else:
+                self.bad_lines += 1
+        return messages
+
+
+async def stream_messages(command, spawn=asyncio.create_subprocess_exec, chunk_size=CHUNK_SIZE):
+    """Messages printed by a stream process, as they arrive, until it exits
+
+    An async generator; the process is terminated when the generator is
+    closed, so consumers that may stop early should aclose() it.
+    """
+    process = await spawn(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    parser = JsonLinesParser()
+    try:
+        while True:
+            data = await process.stdout.read(chunk_size)
+            if not data:
+                break
+            for message in parser.feed(data):
+                yield message
+        for message in parser.close():
+            yield message
+    finally:
+        if process.returncode is None:
+            try:
+                process.terminate()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+
+
+class MacMediaStream:
+    """Current now-playing state, kept up to date by one stream process
+
+    command:  argv of the stream process (see stream_command())
+    popen:    subprocess.Popen or anything with the same signature whose
+              result has .stdout (text lines), .terminate() and .wait()
+    """
+
+    def __init__(self, command, popen=subprocess.Popen, restart_delay=RESTART_DELAY):
+        self._command = command
+        self._popen = popen
+        self._restart_delay = restart_delay
+        self._lock = threading.Lock()
+        self._state = None
+        self._first_state = threading.Event()
+        self._first_query = True
+        self._stopped = threading.Event()
+        self._process = None
+        self._thread = None
+        self.failed = False
+        self.stats = {
+            "starts": 0,
+            "messages": 0,
+            "bad_lines": 0,
+        }
+
+    def start(self):
+        """Start reading in a daemon thread"""
+        self._thread = threading.Thread(target=self._run, name='macos-media-stream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the process and the reader"""
+        self._stopped.set()
+        process = self._process
+        if process is not None:
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    @property
+    def alive(self):
+        """False once the stream has given up; callers should fall back"""
+        return not self.failed and not self._stopped.is_set()
+
+    def current(self, timeout=FIRST_STATE_TIMEOUT):
+        """Copy of the latest state (the `get` payload), or None
+
+        The first call waits up to timeout for the stream to report, so the
+        very first poll still sees what is playing. Later calls never wait:
+        the dashboards poll from their event loop, which a silent adapter
+        would otherwise hold up on every poll.
+        """
+        if self._first_query:
+            self._first_query = False
+            self._first_state.wait(timeout)
+        with self._lock:
+            return dict(self._state) if self._state else None
+
+    def _run(self):
+        failures = 0
+        while not self._stopped.is_set():
+            try:
+                self._process = self._popen(
+                    self._command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1
+                )
+            except OSError as e:
+                print(f"Media stream failed to start: {e}")
+                break
+            self.stats["starts"] += 1
+            if self._read(self._process):
+                failures = 0
+            else:
+                failures += 1
+            try:
+                self._process.wait()
+            except Exception:
+                pass
+            # Nothing is known while the stream is down
+            with self._lock:
+                self._state = None
+            if failures >= MAX_FAILURES:
+                print("Media stream keeps exiting, giving up")
+                break
+            self._stopped.wait(self._restart_delay)
+        if not self._stopped.is_set():
+            self.failed = True
+        # Don't leave a first query waiting for a state that won't come
+        self._first_state.set()
+
+    def _read(self, process):
+        """Fold the process's output into the state; True if it said anything"""
+        received = False
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                self.stats["bad_lines"] += 1
+                continue
+            if not isinstance(message, dict):
+                self.stats["bad_lines"] += 1
+                continue
+            with self._lock:
+                self._state = apply_message(self._state, message)
+            self.stats["messages"] += 1
+            received = True
+            self._first_state.set()
+        return received
+
+
+def start_macos_stream():
+    """A started MacMediaStream, or None if no adapter is available"""
+    command = stream_command()
+    if command is None:
+        return None
+    return MacMediaStream(command).start()
@@ -0,0 +1,206 @@
+"""
+Media updates - the blade detector's decisions about provider samples
+
+What blade-song-detector.py does with each sample it gets from a media
+provider, without the I/O around it:
+
+  should_send_update     whether a sample is worth sending to LedFx
+  stream_message_kind    what a media-control stream message is about
+  merge_stream_payload   a stream message (possibly a diff) merged into the
+                         previous state
+  at_track_end           a sample at or past the track's duration
+
+Nothing here reads the clock unless no `now` is given, and artwork arrives
+as a path the caller already saved, so session_replay.py can run recorded
+sessions through exactly this code, faster than real time.
+"""
+
+import time
+
+from macos_media_stream import timestamp_seconds
+from playback_clock import extrapolate, timing_diverged
+
+# Sent once when playback stops
+NO_MEDIA = {"artist": "Unknown", "title": "No media is currently playing"}
+
+
+def parse_time_value(value):
+    """Parse time values that may have 's' suffix (e.g., '5081.3s' -> 5081.3)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return float(value.rstrip('s'))
+    return float(value)
+
+
+def should_send_update(current, previous):
+    """Determine if we should send an update based on state changes"""
+    if previous is None:
+        return True
+
+    # Track changed (use content_id for robust detection)
+    curr_content_id = current.get('content_id')
+    prev_content_id = previous.get('content_id')
+    if curr_content_id and prev_content_id and curr_content_id != prev_content_id:
+        return True
+
+    # Fallback: Track changed (title/artist comparison)
+    if current['title'] != previous['title'] or current['artist'] != previous['artist']:
+        return True
+
+    # Playback state changed (play/pause)
+    if current.get('playing') != previous.get('playing'):
+        return True
+
+    # Artwork changed
+    if current.get('thumbnail') != previous.get('thumbnail'):
+        return True
+
+    # Position jumped significantly (seek detected) - same drift rules as
+    # LedFx's NowPlayingService, so both ends agree on what a seek is
+    if current.get('position') is not None and previous.get('position') is not None:
+        if timing_diverged(previous, current):
+            return True
+
+    return False
+
+
+def stream_message_kind(data):
+    """'update', 'stopped' or 'ignore' for one media-control stream message"""
+    # Check if it's a data payload (stream outputs multiple types)
+    if data.get('type') != 'data':
+        return 'ignore'
+    payload = data.get('payload') or {}
+
+    # Skip empty payloads completely
+    if not payload:
+        return 'ignore'
+
+    # Check if media stopped playing
+    # BUT: Only if 'playing' field is explicitly present (diff:true may omit it)
+    if 'playing' in payload and not payload.get('playing'):
+        return 'stopped'
+
+    # Early filter: ignore if no title AND not a diff:true event
+    # (diff:true events may contain only artwork)
+    if not payload.get('title') and not data.get('diff'):
+        return 'ignore'
+    return 'update'
+
+
+def merge_stream_payload(previous_info, data, thumbnail=None, now=None):
+    """media_info for an 'update' stream message
+
+    thumbnail is where the caller saved the message's artworkData, if it
+    had any. The position is brought up to now (time.time() by default).
+    """
+    if now is None:
+        now = time.time()
+    payload = data['payload']
+
+    # Parse artist
+    artist = payload.get('artist', 'Unknown')
+    if artist.endswith(' - Topic'):
+        artist = artist[:-8].strip()
+
+    # Parse ISO timestamp or use current time
+    timestamp_str = payload.get('timestamp')
+    timestamp = timestamp_seconds(timestamp_str) or now
+
+    # Build media_info - merge with previous to handle diff:true events
+    # BUT: Don't merge if track changed (different title/artist)
+    should_merge = False
+    if previous_info and data.get('diff'):
+        # Check if track changed before merging
+        prev_title = previous_info.get('title', '')
+        prev_artist = previous_info.get('artist', '')
+        curr_title = payload.get('title', prev_title)  # Use prev if not in payload
+        curr_artist = artist if artist != 'Unknown' else previous_info.get('artist', '')
+
+        # Only merge if same track (title/artist unchanged)
+        if curr_title == prev_title and curr_artist == prev_artist:
+            should_merge = True
+
+    if should_merge:
+        # diff:true - merge update with previous state (SAME track)
+        media_info = previous_info.copy()
+
+        # Handle artwork if present in diff
+        if payload.get('artworkData'):
+            media_info['thumbnail'] = thumbnail
+
+        # Update only fields that are present in payload
+        if 'title' in payload:
+            media_info['title'] = payload['title']
+        if artist != 'Unknown':
+            media_info['artist'] = artist
+        if 'album' in payload:
+            media_info['album'] = payload.get('album', '')
+        if 'elapsedTime' in payload:
+            media_info['position'] = parse_time_value(payload['elapsedTime'])
+        if 'duration' in payload:
+            media_info['duration'] = parse_time_value(payload['duration'])
+        if 'playing' in payload:
+            media_info['playing'] = payload['playing']
+        if timestamp_str:
+            media_info['timestamp'] = timestamp
+        if 'contentItemIdentifier' in payload:
+            media_info['content_id'] = payload['contentItemIdentifier']
+    else:
+        # diff:false or no previous - full update
+        media_info = {
+            "title": payload.get('title', 'Unknown'),
+            "artist": artist,
+            "album": payload.get('album', ''),
+            "thumbnail": thumbnail if payload.get('artworkData') else None,
+            "position": parse_time_value(payload.get('elapsedTime')),
+            "duration": parse_time_value(payload.get('duration')),
+            "playing": payload.get('playing', False),
+            "timestamp": timestamp,
+            "content_id": payload.get('contentItemIdentifier')
+        }
+
+    # Detect track change
+    track_changed = False
+    if previous_info:
+        prev_title = previous_info.get('title', '')
+        prev_artist = previous_info.get('artist', '')
+        prev_content_id = previous_info.get('content_id')
+
+        curr_title = media_info.get('title', '')
+        curr_artist = media_info.get('artist', '')
+        curr_content_id = media_info.get('content_id')
+
+        # Track changed if title/artist/contentId different
+        if (curr_title != prev_title or
+            curr_artist != prev_artist or
+            (curr_content_id and prev_content_id and curr_content_id != prev_content_id)):
+            track_changed = True
+
+    # On track change: reset position to 0 and clear old duration
+    if track_changed:
+        media_info['position'] = 0
+        # Don't inherit old track's duration if new track has no duration
+        if media_info.get('duration', 0) == 0:
+            media_info['duration'] = 0
+
+    # Bring the anchor up to now. The pair is re-stamped so a
+    # later diff merge that copies it never counts the same
+    # elapsed time twice.
+    if media_info.get('playing') and media_info.get('timestamp'):
+        media_info['position'] = extrapolate(
+            media_info.get('position') or 0,
+            media_info['timestamp'],
+            True,
+            now=now,
+        )
+        media_info['timestamp'] = now
+
+    return media_info
+
+
+def at_track_end(info):
+    """Whether position has reached duration (0 duration means unknown)"""
+    duration = info.get('duration')
+    position = info.get('position')
+    return bool(duration and position and duration > 0 and position >= duration)
@@ -0,0 +1,165 @@
+"""
+Playback clock - one answer to "where is the track now?"
+
+Every detector mode used to extrapolate position its own way: Terminal Plus
+kept a track start time, the macOS stream added time.time() - timestamp, the
+monitor interpolated from SMTC's last_updated_time and should_send_update
+predicted an expected position with its own 2 s threshold.
+
+PlaybackClock takes anchor samples (position, playing, and the wall-clock time
+the sample was taken), keeps them on the monotonic clock, and answers the
+current position. It re-anchors only when a sample diverges from its own
+extrapolation, using the same rules as LedFx's NowPlayingService
+(_timing_diverged): 2 s while playing, 1 s while paused, or any play/pause
+flip. Between anchors nothing needs polling, so callers can move to
+event-only updates without the display drifting.
+"""
+
+import time
+
+# Same thresholds as ledfx/nowplaying/service.py - a tighter bound would
+# re-anchor on ordinary jitter and turn an event feed back into a poll
+POSITION_DRIFT_PLAYING = 2.0
+POSITION_DRIFT_PAUSED = 1.0
+
+
+def extrapolate(position, timestamp, playing, duration=None, now=None):
+    """Position now, from a single (position, wall timestamp) sample"""
+    if position is None:
+        return None
+    if playing and timestamp is not None:
+        if now is None:
+            now = time.time()
+        position += max(0.0, now - timestamp)
+    if duration:
+        position = min(position, duration)
+    return position
+
+
+def timing_diverged(anchor, sample):
+    """Whether sample disagrees with what anchor predicts
+
+    Both are dicts with 'position', 'playing' and 'timestamp' (wall-clock
+    time the position was sampled). Mirrors NowPlayingService._timing_diverged.
+    """
+    position = sample.get('position')
+    if position is None:
+        return False
+
+    anchor_position = anchor.get('position')
+    anchor_timestamp = anchor.get('timestamp')
+    if anchor_position is None or anchor_timestamp is None:
+        return True
+    if bool(sample.get('playing')) != bool(anchor.get('playing')):
+        return True
+
+    if not sample.get('playing'):
+        # Paused: the position should not move at all, so any real movement
+        # is a seek
+        return abs(position - anchor_position) > POSITION_DRIFT_PAUSED
+
+    predicted = extrapolate(
+        anchor_position,
+        anchor_timestamp,
+        True,
+        now=sample.get('timestamp') or time.time(),
+    )
+    return abs(position - predicted) > POSITION_DRIFT_PLAYING
+
+
+class PlaybackClock:
+    """Monotonic playback clock fed by anchor samples
+
+    update() returns why the clock re-anchored - 'anchor' (first sample),
+    'play', 'pause' or 'seek' - or None if the sample agreed with the
+    running extrapolation and was absorbed.
+    """
+
+    def __init__(self, monotonic=time.monotonic, wall=time.time):
+        self._monotonic = monotonic
+        self._wall = wall
+        self.reset()
+
+    def reset(self):
+        """Forget the anchor - call on track change"""
+        self._position = None
+        self._anchor_mono = None
+        self._anchor_wall = None
+        self._playing = False
+        self.duration = None
+        self.reanchors = 0
+
+    @property
+    def has_anchor(self):
+        return self._position is not None
+
+    @property
+    def playing(self):
+        return self._playing
+
+    def update(self, position, playing, timestamp=None, duration=None):
+        """Feed a sample; timestamp is the wall time the position was read"""
+        if duration:
+            self.duration = duration
+        playing = bool(playing)
+
+        now_mono = self._monotonic()
+        now_wall = self._wall()
+        if timestamp is None:
+            timestamp = now_wall
+        # Translate the wall-clock sample time onto the monotonic clock once,
+        # so later answers are immune to wall-clock steps (NTP, DST, sleep)
+        sample_mono = now_mono - max(0.0, now_wall - timestamp)
+
+        if position is None:
+            if self._position is None:
+                # No timing from the provider yet: assume the track started
+                # when we first saw it, rather than showing nothing
+                self._set(0.0, playing, sample_mono, timestamp)
+                return 'anchor'
+            if playing != self._playing:
+                # Keep counting from where we are, just flip the state
+                self._set(self.position(), playing, now_mono, now_wall)
+                return 'play' if playing else 'pause'
+            return None
+
+        if self._position is None:
+            reason = 'anchor'
+        elif playing != self._playing:
+            reason = 'play' if playing else 'pause'
+        else:
+            predicted = self._position_at(sample_mono)
+            drift = POSITION_DRIFT_PLAYING if playing else POSITION_DRIFT_PAUSED
+            reason = 'seek' if abs(position - predicted) > drift else None
+
+        if reason is not None:
+            self._set(position, playing, sample_mono, timestamp)
+        return reason
+
+    def position(self):
+        """Current extrapolated position in seconds, or None"""
+        if self._position is None:
+            return None
+        return self._position_at(self._monotonic())
+
+    def anchor(self):
+        """(position, wall timestamp, playing) of the current anchor
+
+        This is what a client extrapolating on its own should be sent.
+        """
+        return self._position, self._anchor_wall, self._playing
+
+    def _position_at(self, mono):
+        position = self._position
+        if self._playing:
+            position += max(0.0, mono - self._anchor_mono)
+        if self.duration:
+            position = min(position, self.duration)
+        return position
+
+    def _set(self, position, playing, mono, wall):
+        self._position = float(position)
+        self._playing = playing
+        self._anchor_mono = mono
+        self._anchor_wall = wall
+        self.reanchors += 1
@@ -6,21 +6,7 @@ Renders album artwork as ANSI colored text art in the terminal
 import os
 from PIL import Image
 
-def rgb_to_ansi(r, g, b):
-    """Convert RGB values to ANSI 256-color code"""
-    # Use 216-color cube (16-231)
-    # Each component has 6 levels: 0, 95, 135, 175, 215, 255
-    levels = [0, 95, 135, 175, 215, 255]
-    
-    def closest_level(value):
-        return min(range(6), key=lambda i: abs(levels[i] - value))
-    
-    r_idx = closest_level(r)
-    g_idx = closest_level(g)
-    b_idx = closest_level(b)
-    
-    color_code = 16 + 36 * r_idx + 6 * g_idx + b_idx
-    return color_code
+import ansi_art
 
 def render_image_ansi(image_path, width=80):
     """Render an image as ANSI colored blocks in terminal"""
@@ -30,33 +16,14 @@ def render_image_ansi(image_path, width=80):
         return
     
     try:
-        # Open and resize image
-        img = Image.open(image_path)
-        
-        # Calculate height to maintain aspect ratio (characters are ~2x taller than wide)
-        aspect_ratio = img.height / img.width
-        height = int(width * aspect_ratio * 0.5)  # 0.5 to account for character aspect ratio
-        
-        # Resize image
-        img = img.resize((width, height), Image.Resampling.LANCZOS)
-        img = img.convert('RGB')
-        
-        # Get pixel data
-        pixels = img.load()
+        # Resized, quantised and merged into runs of colour in ansi_art
+        lines = ansi_art.render_ansi(image_path, width)
         
         print(f"\n{'='*width}")
         print(f"Album Art: {os.path.basename(image_path)}")
         print(f"{'='*width}\n")
         
-        # Render each row
-        for y in range(height):
-            line = ""
-            for x in range(width):
-                r, g, b = pixels[x, y]
-                color_code = rgb_to_ansi(r, g, b)
-                # Use block character with background color
-                line += f"\033[48;5;{color_code}m \033[0m"
-            print(line)
+        print("\n".join(lines))
         
         print(f"\n{'='*width}\n")
         
@@ -0,0 +1,180 @@
+"""
+Screen buffer - differential redraw for the terminal dashboards
+
+The dashboards used to clear the screen with \\033[2J\\033[H and print every
+line again each second. Over SSH that is several kilobytes a second, and the
+clear makes the whole screen flicker.
+
+ScreenBuffer captures what a frame prints, splits it into terminal cells
+(character plus the SGR colour state in force), and compares it with the
+previous frame column by column. Only runs of changed cells are written,
+each behind a cursor-position escape, so a ticking progress bar or a
+scrolling title costs a few bytes per frame and nothing flickers. The
+screen is only cleared on the first frame and after a resize.
+
+    screen = ScreenBuffer()
+    try:
+        while True:
+            with screen.frame():
+                display(info)
+            await asyncio.sleep(0.1)
+    finally:
+        screen.close()
+"""
+
+import io
+import re
+import shutil
+import sys
+import unicodedata
+from contextlib import contextmanager, redirect_stdout
+
+_ESCAPE = re.compile(r'\033\[[0-9;?]*[A-Za-z]')
+
+CLEAR_SCREEN = '\033[2J\033[H'
+HIDE_CURSOR = '\033[?25l'
+SHOW_CURSOR = '\033[?25h'
+RESET = '\033[0m'
+CLEAR_TO_END_OF_LINE = '\033[K'
+
+# Rewriting a few unchanged cells is cheaper than another cursor move
+MERGE_GAP = 4
+
+# A plain space, what a cleared screen already shows
+BLANK = ('', ' ')
+# Second column of a double-width character
+CONTINUATION = ('', '')
+
+
+def parse_line(line, width=None):
+    """Cells of one printed line, one per terminal column
+
+    Each cell is (sgr, char), sgr being the escapes in force since the last
+    reset. Double-width characters take a second, CONTINUATION cell. With a
+    width the line is cut to that many columns, as a longer one would wrap
+    onto the next row behind the diff's back.
+    """
+    cells = []
+    sgr = ''
+    position = 0
+    for match in _ESCAPE.finditer(line + '\033[m'):
+        for char in line[position:match.start()]:
+            cells.append((sgr, char))
+            if unicodedata.east_asian_width(char) in ('W', 'F'):
+                cells.append(CONTINUATION)
+        position = match.end()
+        escape = match.group()
+        if escape.endswith('m'):
+            sgr = '' if escape in ('\033[0m', '\033[m') else sgr + escape
+    if width is not None and len(cells) > width:
+        # Never keep half of a double-width character
+        cut = width - 1 if cells[width] == CONTINUATION else width
+        del cells[max(0, cut):]
+    # A styled space still shows (a background colour); a plain one doesn't
+    while cells and cells[-1] == BLANK:
+        cells.pop()
+    return cells
+
+
+def changed_runs(old, new):
+    """(start, end) column ranges where new differs from old"""
+    runs = []
+    for column in range(min(len(old), len(new))):
+        if old[column] != new[column]:
+            if runs and column - runs[-1][1] <= MERGE_GAP:
+                runs[-1][1] = column + 1
+            else:
+                runs.append([column, column + 1])
+    if len(new) > len(old):
+        if runs and len(old) - runs[-1][1] <= MERGE_GAP:
+            runs[-1][1] = len(new)
+        else:
+            runs.append([len(old), len(new)])
+    # Never start or end in the middle of a double-width character
+    for run in runs:
+        while run[0] > 0 and new[run[0]] == CONTINUATION:
+            run[0] -= 1
+        while run[1] < len(new) and new[run[1]] == CONTINUATION:
+            run[1] += 1
+    return runs
+
+
+def render_cells(cells):
+    """Escapes and characters that draw cells from the cursor on"""
+    out = []
+    sgr = ''
+    for cell_sgr, char in cells:
+        if cell_sgr != sgr:
+            out.append(RESET + cell_sgr if sgr else cell_sgr)
+            sgr = cell_sgr
+        out.append(char)
+    if sgr:
+        out.append(RESET)
+    return ''.join(out)
+
+
+class ScreenBuffer:
+    """Keeps the last frame and writes only what changed"""
+
+    def __init__(self, stream=None, terminal_size=shutil.get_terminal_size):
+        self._stream = stream
+        self._terminal_size = terminal_size
+        self._lines = None
+        self._size = None
+        self.bytes_written = 0
+
+    @contextmanager
+    def frame(self):
+        """Capture everything printed in the block as the next frame"""
+        captured = io.StringIO()
+        with redirect_stdout(captured):
+            yield
+        self.draw(captured.getvalue())
+
+    def draw(self, text):
+        """Update the screen to show text; returns the characters written"""
+        size = tuple(self._terminal_size())
+        # Keep the last row free: writing there could scroll the screen
+        rows = max(1, size[1] - 1)
+        lines = [parse_line(line, size[0]) for line in text.split('\n')[:rows]]
+        while lines and not lines[-1]:
+            lines.pop()
+
+        out = []
+        previous = self._lines
+        if previous is None or size != self._size:
+            # First frame or resized: the old layout means nothing now
+            out.append(HIDE_CURSOR + CLEAR_SCREEN)
+            previous = []
+        for row, cells in enumerate(lines):
+            old = previous[row] if row < len(previous) else []
+            for start, end in changed_runs(old, cells):
+                out.append(f'\033[{row + 1};{start + 1}H')
+                out.append(render_cells(cells[start:end]))
+            if len(old) > len(cells):
+                out.append(f'\033[{row + 1};{len(cells) + 1}H{CLEAR_TO_END_OF_LINE}')
+        for row in range(len(lines), len(previous)):
+            if previous[row]:
+                out.append(f'\033[{row + 1};1H{CLEAR_TO_END_OF_LINE}')
+
+        self._lines = lines
+        self._size = size
+        return self._write(''.join(out))
+
+    def invalidate(self):
+        """Redraw everything on the next frame, e.g. after printing outside one"""
+        self._lines = None
+
+    def close(self):
+        """Leave the cursor below the last frame and show it again"""
+        rows = len(self._lines) if self._lines else 0
+        self._write(f'{RESET}\033[{rows + 1};1H{SHOW_CURSOR}')
+        self._lines = None
+
+    def _write(self, data):
+        if data:
+            stream = self._stream or sys.stdout
+            stream.write(data)
+            stream.flush()
+            self.bytes_written += len(data)
+        return len(data)
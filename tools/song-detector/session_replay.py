@@ -0,0 +1,369 @@
+"""
+Session replay - record media-provider output, replay it offline
+
+should_send_update, the media-control diff merge and NowPlayingService's
+_timing_diverged could only be judged by playing real music and watching.
+blade-song-detector.py --record FILE now writes every provider sample it
+gets to a JSON-lines file, one object per line:
+
+  {"t": 12.3456, "wall": 1760000000.12, "source": "mpris", "data": {...}}
+
+  t       seconds since the recording started (monotonic)
+  wall    time.time() when the sample arrived
+  source  media-control  a raw stream message ({"type", "diff", "payload"})
+          mpris, smtc,   a polled media-info dict, or null when nothing
+          macos          was playing
+
+artworkData is replaced by its SHA-1, so a recording stays small and
+artwork changes still show.
+
+replay() feeds a recording through two pipelines on a virtual clock, as
+fast as they run:
+
+  detector    what blade-song-detector.py sends: the stream merge or the
+              polling loop, then should_send_update (media_updates.py)
+  nowplaying  NowPlayingModel, LedFx's song_detected decisions for the same
+              provider state
+
+and reports for each the updates emitted, the track changes detected, how
+many of those were false (a track that didn't last FALSE_CHANGE_WINDOW
+seconds, or a placeholder title), and the latency from a change in the
+provider's state (new track, play/pause) to the next emission.
+"""
+
+import hashlib
+import json
+import time
+
+import macos_media_stream
+from media_updates import (NO_MEDIA, at_track_end, merge_stream_payload,
+                           parse_time_value, should_send_update,
+                           stream_message_kind)
+from playback_clock import extrapolate, timing_diverged
+
+# A detected track that is gone again this soon was never really playing
+FALSE_CHANGE_WINDOW = 2.0
+
+# Titles providers report while switching tracks
+PLACEHOLDER_TITLES = (None, '', 'Unknown')
+
+
+class SessionRecorder:
+    """Appends provider samples to a JSON-lines file"""
+
+    def __init__(self, path, monotonic=time.monotonic, wall=time.time):
+        self._monotonic = monotonic
+        self._wall = wall
+        self._started = monotonic()
+        # Line-buffered, so a killed detector leaves a usable recording
+        self._file = open(path, 'a', encoding='utf-8', buffering=1)
+        self.records = 0
+
+    def record(self, source, data):
+        entry = {
+            "t": round(self._monotonic() - self._started, 4),
+            "wall": self._wall(),
+            "source": source,
+            "data": _without_artwork(data),
+        }
+        self._file.write(json.dumps(entry, default=str) + '\n')
+        self.records += 1
+
+    def close(self):
+        self._file.close()
+
+
+def _without_artwork(data):
+    payload = data.get('payload') if isinstance(data, dict) else None
+    if not isinstance(payload, dict) or not payload.get('artworkData'):
+        return data
+    digest = hashlib.sha1(payload['artworkData'].encode()).hexdigest()
+    return {**data, "payload": {**payload, "artworkData": f"sha1:{digest}"}}
+
+
+def load_session(path):
+    """Records of a recording, in order; unreadable lines are skipped"""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and 'wall' in record and 'source' in record:
+                records.append(record)
+    return records
+
+
+class DetectorReplay:
+    """blade-song-detector.py's sending decisions for replayed samples"""
+
+    def __init__(self):
+        self.previous_info = None
+        # (wall, info) of everything sent
+        self.sent = []
+
+    def feed(self, now, source, data):
+        if source == 'media-control':
+            self._stream(now, data)
+        else:
+            self._poll(now, data)
+
+    def _stream(self, now, data):
+        # As in monitor_media_info_macos_stream
+        kind = stream_message_kind(data)
+        if kind == 'stopped':
+            if self.previous_info is not None and self.previous_info.get('playing'):
+                self.sent.append((now, NO_MEDIA))
+                self.previous_info = None
+            return
+        if kind != 'update':
+            return
+        # The recorded digest stands in for the saved artwork's path
+        media_info = merge_stream_payload(
+            self.previous_info, data, data['payload'].get('artworkData'), now=now
+        )
+        if at_track_end(media_info):
+            self.previous_info = media_info
+            return
+        if should_send_update(media_info, self.previous_info):
+            self.sent.append((now, media_info))
+        self.previous_info = media_info
+
+    def _poll(self, now, info):
+        # As in the polling loop of monitor_media_info
+        if should_send_update(info, self.previous_info) if info else self.previous_info is not None:
+            self.sent.append((now, info or NO_MEDIA))
+            self.previous_info = info
+        elif info:
+            self.previous_info = info
+
+
+class NowPlayingModel:
+    """NowPlayingService's song_detected decisions, on the replay clock
+
+    Mirrors set_metadata() in ledfx/nowplaying/service.py: a new track
+    identity (title, artist, album, track id) asks for song_detected, and so
+    does a sample whose timing diverged from the last emitted anchor
+    (playback_clock.timing_diverged, the mirror of _timing_diverged).
+    Requests within SONG_DETECTED_WINDOW are coalesced into one emission
+    built at the end of it, like _emit_song_detected; the extra wait for
+    artwork still being processed is not modelled.
+    """
+
+    SONG_DETECTED_WINDOW = 0.25
+
+    def __init__(self):
+        self._identity = None
+        self._metadata = None
+        self._emitted = None
+        self._pending_until = None
+        # (wall, identity) of every track change, and wall of every emission
+        self.track_changes = []
+        self.emitted = []
+        self.stats = {
+            "requested": 0,
+            "emitted": 0,
+            "suppressed": 0,
+        }
+
+    def advance(self, now):
+        """Fire a coalesced emission whose window closed by now"""
+        if self._pending_until is not None and self._pending_until <= now:
+            self._flush(self._pending_until)
+
+    def set_metadata(self, now, metadata):
+        self.advance(now)
+        identity = (
+            metadata.get('title'),
+            metadata.get('artist'),
+            metadata.get('album'),
+            metadata.get('track_id'),
+        )
+        track_changed = identity != self._identity
+        self._identity = identity
+        self._metadata = dict(metadata, updated_at=now)
+        if track_changed:
+            self.track_changes.append((now, identity))
+            self._request(now)
+        elif self._timing_diverged(now, metadata):
+            self._request(now)
+
+    def _timing_diverged(self, now, metadata):
+        if metadata.get('position') is None:
+            return False
+        if self._emitted is None:
+            return True
+        return timing_diverged(self._emitted, {
+            "position": metadata['position'],
+            "playing": metadata.get('playing'),
+            "timestamp": now,
+        })
+
+    def _request(self, now):
+        self.stats["requested"] += 1
+        if self._pending_until is not None:
+            self.stats["suppressed"] += 1
+            return
+        self._pending_until = now + self.SONG_DETECTED_WINDOW
+
+    def _flush(self, now):
+        self._pending_until = None
+        metadata = self._metadata
+        if not metadata or not metadata.get('title'):
+            return
+        position = metadata.get('position')
+        self._emitted = {
+            "position": position,
+            "timestamp": metadata['updated_at'] if position is not None else None,
+            "playing": bool(metadata.get('playing')),
+        }
+        self.stats["emitted"] += 1
+        self.emitted.append(now)
+
+
+def _metadata(info, now):
+    """What a LedFx provider would report for a media-info dict at now"""
+    position = info.get('position')
+    if position is not None:
+        position = extrapolate(position, info.get('timestamp'), info.get('playing'), now=now)
+    return {
+        "title": info.get('title'),
+        "artist": info.get('artist'),
+        "album": info.get('album'),
+        "track_id": info.get('content_id'),
+        "position": position,
+        "duration": info.get('duration'),
+        "playing": bool(info.get('playing')),
+    }
+
+
+def _stream_info(state):
+    """The adapter's merged `get` payload as a media-info dict
+
+    The adapter may send times as strings like "5081.3s".
+    """
+    return {
+        "title": state.get('title'),
+        "artist": state.get('artist'),
+        "album": state.get('album'),
+        "content_id": state.get('contentItemIdentifier'),
+        "position": parse_time_value(state.get('elapsedTime')),
+        "duration": parse_time_value(state.get('duration')),
+        "playing": state.get('playing'),
+        "timestamp": macos_media_stream.timestamp_seconds(state.get('timestamp')),
+    }
+
+
+def _percentiles(values):
+    if not values:
+        return {"n": 0, "p50": None, "p95": None, "max": None}
+    values = sorted(values)
+
+    def pick(fraction):
+        return round(values[min(len(values) - 1, int(fraction * len(values)))] * 1000, 1)
+
+    return {"n": len(values), "p50": pick(0.5), "p95": pick(0.95), "max": pick(1.0)}
+
+
+def _false_changes(changes, end, window):
+    """Track changes to a placeholder, or to a track gone within window"""
+    false = 0
+    for index, (started, identity) in enumerate(changes):
+        ended = changes[index + 1][0] if index + 1 < len(changes) else end
+        if identity[0] in PLACEHOLDER_TITLES or ended - started < window:
+            false += 1
+    return false
+
+
+def _latencies(state_changes, emissions):
+    """Delay from each provider state change to the next emission after it
+
+    A change with no emission before the next change counts as missed.
+    """
+    latencies = []
+    missed = 0
+    index = 0
+    for number, changed in enumerate(state_changes):
+        following = state_changes[number + 1] if number + 1 < len(state_changes) else None
+        while index < len(emissions) and emissions[index] < changed:
+            index += 1
+        if index < len(emissions) and (following is None or emissions[index] < following):
+            latencies.append(emissions[index] - changed)
+        else:
+            missed += 1
+    return latencies, missed
+
+
+def replay(records, false_change_window=FALSE_CHANGE_WINDOW):
+    """Run records through the detector and NowPlaying; returns the report"""
+    detector = DetectorReplay()
+    nowplaying = NowPlayingModel()
+    stream_state = None
+    # Provider state changes (track or play/pause), the ground truth
+    state_changes = []
+    last_state = None
+    sources = {}
+
+    started = time.perf_counter()
+    for record in records:
+        now = record['wall']
+        source = record['source']
+        data = record['data']
+        sources[source] = sources.get(source, 0) + 1
+        nowplaying.advance(now)
+
+        detector.feed(now, source, data)
+
+        if source == 'media-control':
+            stream_state = macos_media_stream.apply_message(stream_state, data or {})
+            info = _stream_info(stream_state) if stream_state else None
+        else:
+            info = data
+        if info and info.get('title'):
+            nowplaying.set_metadata(now, _metadata(info, now))
+
+        state = (info.get('title'), info.get('artist'), bool(info.get('playing'))) if info else None
+        if state != last_state:
+            if last_state is not None or state is not None:
+                state_changes.append(now)
+            last_state = state
+    end = records[-1]['wall'] if records else 0.0
+    # Let a last coalescing window close
+    nowplaying.advance(float('inf'))
+    replay_seconds = time.perf_counter() - started
+
+    detector_changes = []
+    last_identity = None
+    for sent_at, info in detector.sent:
+        if info is NO_MEDIA:
+            continue
+        identity = (info.get('title'), info.get('artist'))
+        if identity != last_identity:
+            detector_changes.append((sent_at, identity))
+            last_identity = identity
+
+    span = end - records[0]['wall'] if records else 0.0
+    report = {
+        "records": len(records),
+        "sources": sources,
+        "session_seconds": round(span, 3),
+        "replay_seconds": round(replay_seconds, 4),
+        "speedup": round(span / replay_seconds) if replay_seconds > 0 else None,
+        "state_changes": len(state_changes),
+    }
+    for name, emissions, changes in (
+        ("detector", [sent_at for sent_at, _ in detector.sent], detector_changes),
+        ("nowplaying", nowplaying.emitted, nowplaying.track_changes),
+    ):
+        latencies, missed = _latencies(state_changes, emissions)
+        report[name] = {
+            "updates": len(emissions),
+            # The first track is not a change
+            "track_changes": max(0, len(changes) - 1),
+            "false_track_changes": _false_changes(changes[1:], end, false_change_window),
+            "latency_ms": _percentiles(latencies),
+            "missed_changes": missed,
+        }
+    report["nowplaying"].update(nowplaying.stats)
+    return report
@@ -0,0 +1,367 @@
+"""
+Event-driven Windows media session (SMTC) provider
+
+Creates the session manager once and keeps a cached snapshot of the current
+session, refreshed only when Windows says something changed:
+
+  CurrentSessionChanged       -> re-attach to the new session, refresh all
+  MediaPropertiesChanged      -> re-read title/artist/album, and the thumbnail
+                                 only if the track identity actually changed
+  PlaybackInfoChanged         -> re-read playing/paused
+  TimelinePropertiesChanged   -> re-read position/duration anchor
+
+A poll of get_windows_media_info() then costs a dict copy instead of a
+request_async() round trip plus a full thumbnail stream read.
+
+Nothing here imports winsdk except start_windows_provider(), so the provider
+itself can be driven on Linux with a fake manager/session object that exposes
+the same method names.
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+# GlobalSystemMediaTransportControlsSessionPlaybackStatus.PLAYING
+PLAYBACK_STATUS_PLAYING = 4
+
+# (event name on the session, refresh kind)
+_SESSION_EVENTS = (
+    ("media_properties_changed", "media"),
+    ("playback_info_changed", "playback"),
+    ("timeline_properties_changed", "timeline"),
+)
+
+
+def _seconds(value):
+    """TimeSpan (timedelta) -> seconds, or None"""
+    if value is None:
+        return None
+    try:
+        return value.total_seconds()
+    except AttributeError:
+        return float(value)
+
+
+def _epoch(value):
+    """DateTime (aware datetime) -> epoch seconds, or None"""
+    if value is None:
+        return None
+    try:
+        stamp = value.timestamp()
+    except (AttributeError, OSError, OverflowError, ValueError):
+        return None
+    # SMTC reports year 1601 for sessions that never published a timeline
+    return stamp if stamp > 0 else None
+
+
+class SMTCSessionProvider:
+    """Cached, event-driven view of the current SMTC media session
+
+    manager:         session manager (GlobalSystemMediaTransportControlsSessionManager
+                     or a fake with get_current_session/add_/remove_current_session_changed)
+    read_thumbnail:  async callable(thumbnail_ref) -> bytes
+    save_thumbnail:  callable(bytes) -> path (str) or None; None to never
+                     read thumbnails at all
+    """
+
+    def __init__(self, manager, read_thumbnail, save_thumbnail, loop=None):
+        self._manager = manager
+        self._read_thumbnail = read_thumbnail
+        self._save_thumbnail = save_thumbnail
+        self._loop = loop
+
+        self._manager_token = None
+        self._session = None
+        self._session_tokens = []
+
+        # Cached snapshot pieces
+        self._media = None          # dict(title, artist, album, album_artist, ...)
+        self._media_identity = None
+        self._thumbnail_path = None
+        self._timeline = None       # dict(position, duration, timestamp, start, ...)
+        self._playback_status = None
+
+        self._pending = set()
+        self._dirty = set()
+        self._changed = asyncio.Event()
+
+        self.stats = {
+            "media_refreshes": 0,
+            "thumbnail_reads": 0,
+            "thumbnail_skips": 0,
+            "playback_refreshes": 0,
+            "timeline_refreshes": 0,
+            "session_changes": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Subscribe to the manager and take the first full snapshot"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        self._manager_token = self._manager.add_current_session_changed(
+            self._threadsafe("session")
+        )
+        await self._attach(self._manager.get_current_session())
+
+    def stop(self):
+        """Drop every WinRT subscription"""
+        self._detach()
+        if self._manager_token is not None:
+            try:
+                self._manager.remove_current_session_changed(self._manager_token)
+            except Exception:
+                pass
+            self._manager_token = None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def state(self):
+        """Current snapshot as a plain dict, or None if nothing is playing"""
+        if self._session is None or self._media is None:
+            return None
+
+        timeline = self._timeline or {}
+        return {
+            "title": self._media["title"],
+            "artist": self._media["artist"],
+            "album": self._media["album"],
+            "thumbnail": self._thumbnail_path,
+            "position": timeline.get("position"),
+            "duration": timeline.get("duration"),
+            "playing": self._playback_status == PLAYBACK_STATUS_PLAYING,
+            "playback_status": self._playback_status,
+            # Wall-clock time the position was sampled at - the anchor to
+            # extrapolate from, not the time of this query
+            "timestamp": timeline.get("timestamp"),
+            # Less used properties, for the monitor's detail view
+            "album_artist": self._media["album_artist"],
+            "track_number": self._media["track_number"],
+            "genres": self._media["genres"],
+            "subtitle": self._media["subtitle"],
+            "timeline_start": timeline.get("start"),
+            "timeline_end": timeline.get("end"),
+            "min_seek": timeline.get("min_seek"),
+            "max_seek": timeline.get("max_seek"),
+        }
+
+    async def wait_for_change(self, timeout=None):
+        """Wait until the snapshot changes; True if it did, False on timeout"""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._changed.clear()
+        return True
+
+    # ------------------------------------------------------------------
+    # Event plumbing
+    # ------------------------------------------------------------------
+
+    def _threadsafe(self, kind):
+        """WinRT raises events on its own threads - hop onto the loop"""
+        def handler(sender, args):
+            self._loop.call_soon_threadsafe(self._schedule, kind)
+        return handler
+
+    def _schedule(self, kind):
+        # Bursts of the same event collapse into one refresh. An event that
+        # arrives while that refresh is awaiting (the media properties, the
+        # thumbnail) may carry newer data - typically the second
+        # MediaPropertiesChanged, the one with the artwork - so the refresh
+        # runs once more when it is done.
+        if kind in self._pending:
+            self._dirty.add(kind)
+            return
+        self._pending.add(kind)
+        task = self._loop.create_task(self._refresh(kind))
+        task.add_done_callback(lambda _: self._refreshed(kind))
+
+    def _refreshed(self, kind):
+        self._pending.discard(kind)
+        if kind in self._dirty:
+            self._dirty.discard(kind)
+            self._schedule(kind)
+
+    async def _refresh(self, kind):
+        try:
+            if kind == "session":
+                self.stats["session_changes"] += 1
+                await self._attach(self._manager.get_current_session())
+            elif kind == "media":
+                await self._refresh_media()
+            elif kind == "playback":
+                self._refresh_playback()
+            elif kind == "timeline":
+                self._refresh_timeline()
+        except Exception as e:
+            print(f"SMTC {kind} refresh failed: {e}")
+        self._changed.set()
+
+    async def _attach(self, session):
+        self._detach()
+        self._session = session
+        self._media = None
+        self._media_identity = None
+        self._thumbnail_path = None
+        self._timeline = None
+        self._playback_status = None
+
+        if session is not None:
+            for event, kind in _SESSION_EVENTS:
+                add = getattr(session, f"add_{event}")
+                token = add(self._threadsafe(kind))
+                self._session_tokens.append((event, token))
+            await self._refresh_media()
+            self._refresh_playback()
+            self._refresh_timeline()
+        self._changed.set()
+
+    def _detach(self):
+        session = self._session
+        tokens, self._session_tokens = self._session_tokens, []
+        self._session = None
+        if session is None:
+            return
+        for event, token in tokens:
+            try:
+                getattr(session, f"remove_{event}")(token)
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Refreshers
+    # ------------------------------------------------------------------
+
+    async def _refresh_media(self):
+        session = self._session
+        if session is None:
+            return
+        info = await session.try_get_media_properties_async()
+        if session is not self._session:
+            return  # session switched while awaiting
+        self.stats["media_refreshes"] += 1
+        if info is None:
+            self._media = None
+            return
+
+        thumbnail = getattr(info, "thumbnail", None)
+        self._media = {
+            "title": info.title or "",
+            "artist": info.artist or "",
+            "album": info.album_title or "",
+            "album_artist": getattr(info, "album_artist", None) or None,
+            "track_number": getattr(info, "track_number", None) or None,
+            "genres": list(getattr(info, "genres", None) or ()) or None,
+            "subtitle": getattr(info, "subtitle", None) or None,
+        }
+
+        # SMTC fires MediaPropertiesChanged in bursts, often once without the
+        # thumbnail and again with it - only re-read the image when the track
+        # (or the presence of its artwork) actually changed.
+        identity = (
+            self._media["title"],
+            self._media["artist"],
+            self._media["album"],
+            thumbnail is not None,
+        )
+        if identity == self._media_identity:
+            self.stats["thumbnail_skips"] += 1
+            return
+        self._media_identity = identity
+
+        self._thumbnail_path = None
+        if thumbnail is None or self._save_thumbnail is None:
+            return
+        try:
+            data = await self._read_thumbnail(thumbnail)
+            self.stats["thumbnail_reads"] += 1
+            if data and session is self._session:
+                self._thumbnail_path = self._save_thumbnail(data)
+        except Exception as e:
+            print(f"Failed to save album art: {e}")
+
+    def _refresh_playback(self):
+        session = self._session
+        if session is None:
+            return
+        self.stats["playback_refreshes"] += 1
+        playback_info = session.get_playback_info()
+        self._playback_status = (
+            playback_info.playback_status if playback_info else None
+        )
+
+    def _refresh_timeline(self):
+        session = self._session
+        if session is None:
+            return
+        self.stats["timeline_refreshes"] += 1
+        timeline = session.get_timeline_properties()
+        if timeline is None:
+            self._timeline = None
+            return
+
+        duration = None
+        start = _seconds(getattr(timeline, "start_time", None))
+        end = _seconds(getattr(timeline, "end_time", None))
+        if start is not None and end is not None:
+            duration = end - start
+
+        self._timeline = {
+            "position": _seconds(getattr(timeline, "position", None)),
+            "duration": duration,
+            "timestamp": _epoch(getattr(timeline, "last_updated_time", None))
+            or time.time(),
+            "start": start,
+            "end": end,
+            "min_seek": _seconds(getattr(timeline, "min_seek_time", None)),
+            "max_seek": _seconds(getattr(timeline, "max_seek_time", None)),
+        }
+
+
+def save_windows_thumbnail(data):
+    """Save thumbnail bytes to the LedFx assets directory"""
+    appdata = Path(os.getenv('APPDATA'))
+    assets_dir = appdata / ".ledfx" / "assets"
+    assets_dir.mkdir(parents=True, exist_ok=True)
+    thumbnail_path = assets_dir / "current_album_art.jpg"
+    with open(thumbnail_path, 'wb') as f:
+        f.write(data)
+    return str(thumbnail_path)
+
+
+async def read_winrt_thumbnail(thumbnail):
+    """Read an IRandomAccessStreamReference into bytes (Windows only)"""
+    from winsdk.windows.storage.streams import DataReader
+
+    thumb_stream = await thumbnail.open_read_async()
+    reader = DataReader(thumb_stream)
+    try:
+        await reader.load_async(thumb_stream.size)
+        buffer = reader.read_buffer(thumb_stream.size)
+        return bytes(bytearray(buffer))
+    finally:
+        reader.close()
+        thumb_stream.close()
+
+
+async def start_windows_provider(save_thumbnail):
+    """Create the session manager once and return a started provider
+
+    save_thumbnail=None skips the artwork, for callers that never show it.
+    """
+    from winsdk.windows.media.control import \
+        GlobalSystemMediaTransportControlsSessionManager as MediaManager
+
+    manager = await MediaManager.request_async()
+    provider = SMTCSessionProvider(manager, read_winrt_thumbnail, save_thumbnail)
+    await provider.start()
+    return provider
@@ -8,12 +8,20 @@ import asyncio
 import platform
 import sys
 import time
-from datetime import timedelta, datetime
+from datetime import timedelta
+
+from media_updates import parse_time_value
+from playback_clock import extrapolate
+from screen_buffer import ScreenBuffer
+
+# Redraws are differential, so they can run at 10 Hz while the media session
+# is still polled once a second
+REDRAW_INTERVAL = 0.1
+MEDIA_POLL_INTERVAL = 1.0
 
 # Platform-specific imports
 if platform.system() == "Windows":
-    from winsdk.windows.media.control import \
-        GlobalSystemMediaTransportControlsSessionManager as MediaManager
+    import smtc_session
 elif platform.system() == "Linux":
     try:
         import dbus
@@ -22,8 +30,14 @@ elif platform.system() == "Linux":
         sys.exit(1)
 elif platform.system() == "Darwin":
     import subprocess
-    import ctypes
-    from pathlib import Path
+    import macos_media_stream
+
+# Event-driven SMTC session, created on first use and kept for the process
+_smtc_provider = None
+
+# macOS now-playing stream, started on first use and kept for the process;
+# False once it turned out unavailable
+_macos_stream = None
 
 # ANSI color codes for terminal output
 class Colors:
@@ -85,42 +99,21 @@ def print_progress_bar(position, duration, width=40):
     print(f"{' ' * 20}{percentage:.1f}%")
 
 async def get_windows_media_info():
-    """Get comprehensive media info on Windows using SMTC"""
+    """Get comprehensive media info on Windows from the cached SMTC session"""
+    global _smtc_provider
     try:
-        sessions = await MediaManager.request_async()
-        current_session = sessions.get_current_session()
-        
-        if not current_session:
+        if _smtc_provider is None:
+            # The monitor never shows the artwork, so it is not read
+            _smtc_provider = await smtc_session.start_windows_provider(None)
+
+        info = _smtc_provider.state
+        if not info:
             return None
-        
-        # Get media properties
-        info = await current_session.try_get_media_properties_async()
-        
-        # Get timeline properties
-        timeline = current_session.get_timeline_properties()
-        
-        # Get playback info
-        playback_info = current_session.get_playback_info()
-        
-        # Convert position/duration from TimeSpan to seconds
-        position_seconds = None
-        duration_seconds = None
-        last_updated_time = None
-        
-        if timeline:
-            # timeline properties return timedelta objects
-            if hasattr(timeline, 'position') and timeline.position is not None:
-                position_seconds = timeline.position.total_seconds()
-            if hasattr(timeline, 'end_time') and timeline.end_time is not None and hasattr(timeline, 'start_time') and timeline.start_time is not None:
-                duration_seconds = (timeline.end_time - timeline.start_time).total_seconds()
-            if hasattr(timeline, 'last_updated_time') and timeline.last_updated_time is not None:
-                last_updated_time = timeline.last_updated_time
-        
+
         # Get playback status
+        playback_status = info["playback_status"]
         status = "Unknown"
-        is_playing = False
-        if playback_info:
-            playback_status = playback_info.playback_status
+        if playback_status is not None:
             status_map = {
                 0: "Closed",
                 1: "Opened", 
@@ -130,37 +123,35 @@ async def get_windows_media_info():
                 5: "Paused"
             }
             status = status_map.get(playback_status, f"Unknown ({playback_status})")
-            is_playing = (playback_status == 4)  # 4 = Playing
-        
-        # If playing, interpolate position based on elapsed time since last update
-        if is_playing and position_seconds is not None and last_updated_time is not None:
-            try:
-                # last_updated_time is a datetime object
-                now = datetime.now(last_updated_time.tzinfo)
-                elapsed = (now - last_updated_time).total_seconds()
-                position_seconds += elapsed
-                # Don't exceed duration
-                if duration_seconds and position_seconds > duration_seconds:
-                    position_seconds = duration_seconds
-            except Exception:
-                pass  # If interpolation fails, just use the raw position
-        
+        is_playing = info["playing"]
+
+        # If playing, interpolate position from when SMTC last sampled it
+        position_seconds = info["position"]
+        duration_seconds = info["duration"]
+        if is_playing and position_seconds is not None and info["timestamp"] is not None:
+            position_seconds = extrapolate(
+                position_seconds,
+                info["timestamp"],
+                True,
+                duration_seconds,
+            )
+
         return {
-            "title": info.title or "Unknown",
-            "artist": info.artist or "Unknown",
-            "album": info.album_title or "Unknown",
-            "album_artist": info.album_artist or None,
-            "track_number": info.track_number or None,
-            "genres": list(info.genres) if info.genres else None,
+            "title": info["title"] or "Unknown",
+            "artist": info["artist"] or "Unknown",
+            "album": info["album"] or "Unknown",
+            "album_artist": info["album_artist"],
+            "track_number": info["track_number"],
+            "genres": info["genres"],
             "position": position_seconds,
             "duration": duration_seconds,
             "status": status,
-            "subtitle": info.subtitle or None,
+            "subtitle": info["subtitle"],
             "platform": "Windows SMTC",
-            "timeline_start": timeline.start_time.total_seconds() if timeline and hasattr(timeline, 'start_time') and timeline.start_time is not None else None,
-            "timeline_end": timeline.end_time.total_seconds() if timeline and hasattr(timeline, 'end_time') and timeline.end_time is not None else None,
-            "min_seek": timeline.min_seek_time.total_seconds() if timeline and hasattr(timeline, 'min_seek_time') and timeline.min_seek_time is not None else None,
-            "max_seek": timeline.max_seek_time.total_seconds() if timeline and hasattr(timeline, 'max_seek_time') and timeline.max_seek_time is not None else None,
+            "timeline_start": info["timeline_start"],
+            "timeline_end": info["timeline_end"],
+            "min_seek": info["min_seek"],
+            "max_seek": info["max_seek"],
             "is_playing": is_playing,
         }
     except Exception as e:
@@ -227,48 +218,41 @@ def get_linux_media_info():
         return None
 
 def get_macos_media_info():
-    """Get comprehensive media info on macOS using MediaRemote framework"""
+    """Get comprehensive media info on macOS from the shared MediaRemote stream"""
+    global _macos_stream
     try:
-        # Load MediaRemoteAdapter if available
-        adapter_path = Path(__file__).parent / "MediaRemoteAdapter.framework" / "MediaRemoteAdapter"
+        if _macos_stream is None:
+            _macos_stream = macos_media_stream.start_macos_stream() or False
         
-        if not adapter_path.exists():
-            print(f"{Colors.WARNING}MediaRemoteAdapter.framework not found. Using basic AppleScript fallback.{Colors.ENDC}")
+        if not (_macos_stream and _macos_stream.alive):
+            print(f"{Colors.WARNING}MediaRemote adapter not available. Using basic AppleScript fallback.{Colors.ENDC}")
             return get_macos_media_info_applescript()
         
-        # Load the adapter library
-        lib = ctypes.CDLL(str(adapter_path))
-        
-        # Define function signatures
-        lib.getCurrentTrackInfo.restype = ctypes.c_char_p
-        lib.getElapsedTime.restype = ctypes.c_double
-        lib.getDuration.restype = ctypes.c_double
-        lib.isPlaying.restype = ctypes.c_bool
-        
-        # Get track info JSON
-        track_info_json = lib.getCurrentTrackInfo()
-        if not track_info_json:
+        track_info = _macos_stream.current()
+        if not track_info or not track_info.get("title"):
             return None
         
-        import json
-        track_info = json.loads(track_info_json.decode('utf-8'))
-        
-        # Get timing info
-        elapsed_time = lib.getElapsedTime()
-        duration = lib.getDuration()
-        is_playing = lib.isPlaying()
+        # elapsedTime is the position at "timestamp"; bring it up to now.
+        # Both times may come as strings like "5081.3s".
+        is_playing = track_info.get("playing", False)
+        duration = parse_time_value(track_info.get("duration"))
+        position = extrapolate(
+            parse_time_value(track_info.get("elapsedTime")),
+            macos_media_stream.timestamp_seconds(track_info.get("timestamp")),
+            is_playing,
+        )
         
         return {
             "title": track_info.get("title", "Unknown"),
             "artist": track_info.get("artist", "Unknown"),
             "album": track_info.get("album", "Unknown"),
             "album_artist": track_info.get("albumArtist", None),
-            "position": elapsed_time if elapsed_time >= 0 else None,
-            "duration": duration if duration > 0 else None,
+            "position": position if position is not None and position >= 0 else None,
+            "duration": duration if duration and duration > 0 else None,
             "status": "Playing" if is_playing else "Paused",
             "platform": "macOS MediaRemote",
-            "app_name": track_info.get("appName", None),
-            "art_available": track_info.get("hasArtwork", False),
+            "app_name": track_info.get("bundleIdentifier", None),
+            "art_available": bool(track_info.get("artworkData")),
         }
     except Exception as e:
         print(f"{Colors.WARNING}MediaRemote error: {e}. Falling back to AppleScript.{Colors.ENDC}")
@@ -406,15 +390,31 @@ async def main():
     print(f"{Colors.OKCYAN}Platform: {platform.system()}{Colors.ENDC}")
     print(f"{Colors.WARNING}Press Ctrl+C to exit{Colors.ENDC}\n")
     
+    screen = ScreenBuffer()
+    info = None
+    polled_at = None
+    next_poll = 0.0
+    
     try:
-        # Continuous monitoring - updates every second
-        while True:
-            # Clear screen for fresh display
-            print("\033[2J\033[H", end="")
-            
-            info = await get_media_info()
-            display_media_info(info)
-            await asyncio.sleep(1)
+        # Continuous monitoring - polls every second, redraws at 10 Hz with
+        # the position extrapolated from the last poll
+        try:
+            while True:
+                with screen.frame():
+                    if time.monotonic() >= next_poll:
+                        next_poll = time.monotonic() + MEDIA_POLL_INTERVAL
+                        info = await get_media_info()
+                        polled_at = time.time()
+                    
+                    shown = info
+                    if info and info.get("position") is not None and "playing" in str(info.get("status", "")).lower():
+                        shown = dict(info, position=extrapolate(
+                            info["position"], polled_at, True, info.get("duration")
+                        ))
+                    display_media_info(shown)
+                await asyncio.sleep(REDRAW_INTERVAL)
+        finally:
+            screen.close()
         
     except (KeyboardInterrupt, asyncio.CancelledError):
         print(f"\n\n{Colors.OKGREEN}Exited gracefully. Goodbye! 👋{Colors.ENDC}")
@@ -9,15 +9,14 @@ import os
 import argparse
 import platform
 import subprocess
-import json
-import shutil
-import sys
 import base64
 import time
 from pathlib import Path
 from urllib.parse import quote
 from datetime import datetime
 
+from playback_clock import extrapolate, timing_diverged
+
 def parse_time_value(value):
     """Parse time values that may have 's' suffix (e.g., '5081.3s' -> 5081.3)"""
     if value is None:
@@ -28,9 +27,7 @@ def parse_time_value(value):
 
 # Platform-specific imports
 if platform.system() == "Windows":
-    from winsdk.windows.media.control import \
-        GlobalSystemMediaTransportControlsSessionManager as MediaManager
-    from winsdk.windows.storage.streams import DataReader
+    import smtc_session
 elif platform.system() == "Linux":
     try:
         import dbus
@@ -38,46 +35,24 @@ elif platform.system() == "Linux":
         print("⚠️  dbus-python not installed. Install with: pip install dbus-python")
         exit(1)
 elif platform.system() == "Darwin":
-    # macOS - uses subprocess for AppleScript, no additional imports needed
-    pass
+    import macos_media_stream
+
+# Event-driven SMTC session, created on first use and kept for the process
+_smtc_provider = None
+# macOS now-playing stream, likewise; False once it turned out unavailable
+_macos_stream = None
 
 async def get_windows_media_info():
-    """Get current media info on Windows using WinSDK - WITH POSITION TRACKING"""
-    sessions = await MediaManager.request_async()
-    current_session = sessions.get_current_session()
-    if current_session:
-        info = await current_session.try_get_media_properties_async()
-        
-        # Get timeline properties for position tracking
-        timeline = current_session.get_timeline_properties()
-        playback_info = current_session.get_playback_info()
-        
-        # Get thumbnail/album art
-        thumbnail_path = None
-        if info.thumbnail:
-            try:
-                thumb_stream = await info.thumbnail.open_read_async()
-                reader = DataReader(thumb_stream)
-                await reader.load_async(thumb_stream.size)
-                
-                # Save thumbnail to LedFx assets directory
-                appdata = Path(os.getenv('APPDATA'))
-                assets_dir = appdata / ".ledfx" / "assets"
-                assets_dir.mkdir(parents=True, exist_ok=True)
-                thumbnail_path = assets_dir / "current_album_art.jpg"
-                
-                buffer = reader.read_buffer(thumb_stream.size)
-                with open(thumbnail_path, 'wb') as f:
-                    f.write(bytearray(buffer))
-                
-                reader.close()
-                thumb_stream.close()
-            except Exception as e:
-                print(f"Failed to save album art: {e}")
-        
+    """Get current media info on Windows from the cached SMTC session - WITH POSITION TRACKING"""
+    global _smtc_provider
+    if _smtc_provider is None:
+        _smtc_provider = await smtc_session.start_windows_provider(smtc_session.save_windows_thumbnail)
+    
+    info = _smtc_provider.state
+    if info:
         # Extract artist and title from the title field itself
         # YouTube titles are usually formatted as "Artist - Song Title"
-        title_raw = info.title or "Unknown"
+        title_raw = info["title"] or "Unknown"
         
         if ' - ' in title_raw:
             # Split at first dash to get artist and title
@@ -86,38 +61,23 @@ async def get_windows_media_info():
             title = parts[1].strip()
         else:
             # Fallback to using the info fields
-            artist = info.artist or "Unknown"
+            artist = info["artist"] or "Unknown"
             title = title_raw
         
         # Clean up YouTube Music "Topic" artist suffix
         if artist.endswith(' - Topic'):
             artist = artist[:-8].strip()
         
-        # Extract position and duration
-        position_seconds = None
-        duration_seconds = None
-        is_playing = False
-        
-        if timeline:
-            if hasattr(timeline, 'position') and timeline.position is not None:
-                position_seconds = timeline.position.total_seconds()
-            if hasattr(timeline, 'end_time') and timeline.end_time is not None and \
-               hasattr(timeline, 'start_time') and timeline.start_time is not None:
-                duration_seconds = (timeline.end_time - timeline.start_time).total_seconds()
-        
-        if playback_info:
-            playback_status = playback_info.playback_status
-            is_playing = (playback_status == 4)  # 4 = Playing
-        
         return {
             "title": title,
             "artist": artist,
-            "album": info.album_title,
-            "thumbnail": str(thumbnail_path) if thumbnail_path else None,
-            "position": position_seconds,
-            "duration": duration_seconds,
-            "playing": is_playing,
-            "timestamp": time.time()
+            "album": info["album"],
+            "thumbnail": info["thumbnail"],
+            "position": info["position"],
+            "duration": info["duration"],
+            "playing": info["playing"],
+            # When the position was sampled, not when we asked for it
+            "timestamp": info["timestamp"]
         }
     return None
 
@@ -204,16 +164,7 @@ def get_linux_media_info():
 
 def get_macos_media_info():
     """Get current media info on macOS - WITH POSITION TRACKING (if available)"""
-    
-    # Helper function to get script directory (works with PyInstaller)
-    def get_resource_path(relative_path):
-        """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            # PyInstaller creates a temp folder and stores path in _MEIPASS
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-        return os.path.join(base_path, relative_path)
+    global _macos_stream
     
     def save_artwork(artwork_data):
         """Save base64-encoded artwork to file"""
@@ -242,109 +193,42 @@ def get_macos_media_info():
             return None
     
     try:
-        media_info = None
-        
-        # Strategy 1: Try system-installed media-control (if available)
-        if shutil.which('media-control'):
-            try:
-                result = subprocess.run(
-                    ['media-control', 'get'],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                
-                if result.returncode == 0 and result.stdout.strip():
-                    data = json.loads(result.stdout.strip())
-                    if data and data.get('playing') and data.get('title'):
-                        thumbnail_path = None
-                        if data.get('artworkData'):
-                            thumbnail_path = save_artwork(data['artworkData'])
-                        
-                        artist = data.get('artist', 'Unknown')
-                        # Clean up YouTube Music "Topic" artist suffix
-                        if artist.endswith(' - Topic'):
-                            artist = artist[:-8].strip()
-                        
-                        # Parse ISO timestamp or use current time
-                        timestamp_str = data.get('timestamp')
-                        if timestamp_str:
-                            try:
-                                from dateutil.parser import parse as parse_iso
-                                timestamp = parse_iso(timestamp_str).timestamp()
-                            except ImportError:
-                                # Fallback if dateutil not installed
-                                timestamp = time.time()
-                        else:
-                            timestamp = time.time()
-                        
-                        media_info = {
-                            "title": data.get('title', 'Unknown'),
-                            "artist": artist,
-                            "album": data.get('album', ''),
-                            "thumbnail": thumbnail_path,
-                            "position": parse_time_value(data.get('elapsedTime')),
-                            "duration": parse_time_value(data.get('duration')),
-                            "playing": data.get('playing', False),
-                            "timestamp": timestamp,
-                            "content_id": data.get('contentItemIdentifier')
-                        }
-            except Exception as e:
-                print(f"media-control failed: {e}")
+        if _macos_stream is None:
+            _macos_stream = macos_media_stream.start_macos_stream() or False
         
-        # Strategy 2: Use bundled mediaremote-adapter framework
-        if not media_info:
-            try:
-                framework_path = get_resource_path('MediaRemoteAdapter.framework')
-                perl_script = get_resource_path('mediaremote-adapter.pl')
-                
-                if os.path.exists(framework_path) and os.path.exists(perl_script):
-                    result = subprocess.run(
-                        ['/usr/bin/perl', perl_script, framework_path, 'get'],
-                        capture_output=True,
-                        text=True,
-                        timeout=2
-                    )
-                    
-                    if result.returncode == 0 and result.stdout.strip():
-                        data = json.loads(result.stdout.strip())
-                        if data and data.get('playing') and data.get('title'):
-                            thumbnail_path = None
-                            if data.get('artworkData'):
-                                thumbnail_path = save_artwork(data['artworkData'])
-                            
-                            artist = data.get('artist', 'Unknown')
-                            # Clean up YouTube Music "Topic" artist suffix
-                            if artist.endswith(' - Topic'):
-                                artist = artist[:-8].strip()
-                            
-                            # Parse ISO timestamp or use current time
-                            timestamp_str = data.get('timestamp')
-                            if timestamp_str:
-                                try:
-                                    from dateutil.parser import parse as parse_iso
-                                    timestamp = parse_iso(timestamp_str).timestamp()
-                                except ImportError:
-                                    # Fallback if dateutil not installed
-                                    timestamp = time.time()
-                            else:
-                                timestamp = time.time()
-                            
-                            media_info = {
-                                "title": data.get('title', 'Unknown'),
-                                "artist": artist,
-                                "album": data.get('album', ''),
-                                "thumbnail": thumbnail_path,
-                                "position": parse_time_value(data.get('elapsedTime')),
-                                "duration": parse_time_value(data.get('duration')),
-                                "playing": data.get('playing', False),
-                                "timestamp": timestamp,
-                                "content_id": data.get('contentItemIdentifier')
-                            }
-            except Exception as e:
-                print(f"bundled mediaremote-adapter failed: {e}")
+        # Serve from the stream; a one-shot get only if it can't run
+        if _macos_stream and _macos_stream.alive:
+            data = _macos_stream.current()
+        else:
+            data = macos_media_stream.read_once()
         
-        return media_info
+        if data and data.get('playing') and data.get('title'):
+            thumbnail_path = None
+            if data.get('artworkData'):
+                thumbnail_path = save_artwork(data['artworkData'])
+            
+            title = data.get('title', 'Unknown')
+            artist = data.get('artist', 'Unknown')
+            # Clean up YouTube Music "Topic" artist suffix
+            if artist.endswith(' - Topic'):
+                artist = artist[:-8].strip()
+            
+            # elapsedTime is the position at "timestamp", which for a cached
+            # state can be well before now
+            timestamp = macos_media_stream.timestamp_seconds(data.get('timestamp')) or time.time()
+            
+            return {
+                "title": title,
+                "artist": artist,
+                "album": data.get('album', ''),
+                "thumbnail": thumbnail_path,
+                "position": parse_time_value(data.get('elapsedTime')),
+                "duration": parse_time_value(data.get('duration')),
+                "playing": data.get('playing', False),
+                "timestamp": timestamp,
+                "content_id": data.get('contentItemIdentifier')
+            }
+        return None
         
     except Exception as e:
         print(f"Failed to get media info: {e}")
@@ -433,14 +317,10 @@ def should_send_update(current, previous):
     if current.get('thumbnail') != previous.get('thumbnail'):
         return True
     
-    # Position jumped significantly (seek detected)
-    curr_pos = current.get('position')
-    prev_pos = previous.get('position')
-    if curr_pos is not None and prev_pos is not None:
-        # If position jumped more than 2 seconds (accounting for polling delay)
-        time_diff = current.get('timestamp', 0) - previous.get('timestamp', 0)
-        expected_pos = prev_pos + (time_diff if previous.get('playing') else 0)
-        if abs(curr_pos - expected_pos) > 2.0:
+    # Position jumped significantly (seek detected) - same drift rules as
+    # LedFx's NowPlayingService, so both ends agree on what a seek is
+    if current.get('position') is not None and previous.get('position') is not None:
+        if timing_diverged(previous, current):
             return True
     
     return False
@@ -448,7 +328,7 @@ def should_send_update(current, previous):
 async def monitor_media_info(device_name):
     if platform.system() == "Darwin":
         # macOS: Use streaming mode for real-time updates
-        monitor_media_info_macos_stream(device_name)
+        await monitor_media_info_macos_stream(device_name)
     else:
         # Windows/Linux: Poll every second
         previous_info = None
@@ -470,17 +350,9 @@ async def monitor_media_info(device_name):
         except asyncio.CancelledError:
             print("Song Detector Plus exited.")
 
-def monitor_media_info_macos_stream(device_name):
+async def monitor_media_info_macos_stream(device_name):
     """Monitor media info on macOS using stream mode for real-time updates"""
     
-    def get_resource_path(relative_path):
-        """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-        return os.path.join(base_path, relative_path)
-    
     def save_artwork(artwork_data):
         """Save base64-encoded artwork to file"""
         if not artwork_data:
@@ -505,46 +377,22 @@ def monitor_media_info_macos_stream(device_name):
             traceback.print_exc()
             return None
     
+    # System media-control first, then the bundled mediaremote-adapter
+    command = macos_media_stream.stream_command()
+    if not command:
+        print("⚠️  No media-control method available on macOS")
+        return
+    
+    loop = asyncio.get_running_loop()
     previous_info = None
-    process = None
+    messages = macos_media_stream.stream_messages(command)
     
     try:
-        # Try system media-control first
-        if shutil.which('media-control'):
-            process = subprocess.Popen(
-                ['media-control', 'stream'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
-        else:
-            # Use bundled mediaremote-adapter
-            framework_path = get_resource_path('MediaRemoteAdapter.framework')
-            perl_script = get_resource_path('mediaremote-adapter.pl')
-            
-            if os.path.exists(framework_path) and os.path.exists(perl_script):
-                process = subprocess.Popen(
-                    ['/usr/bin/perl', perl_script, framework_path, 'stream'],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
-                )
-        
-        if not process:
-            print("⚠️  No media-control method available on macOS")
-            return
-        
-        # Read streaming output line by line
-        for line in process.stdout:
+        # Messages are decoded as the process prints them, and artwork files
+        # and the protocol handler go to the thread pool, so the event loop
+        # (and the LedFx WebSocket on it) never waits for the stream
+        async for data in messages:
             try:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                data = json.loads(line)
-                
                 # Check if it's a data payload (stream outputs multiple types)
                 if data.get('type') == 'data':
                     payload = data.get('payload', {})
@@ -558,7 +406,7 @@ def monitor_media_info_macos_stream(device_name):
                     if 'playing' in payload and not payload.get('playing'):
                         # Only send "no media" notification once when transitioning from playing
                         if previous_info is not None and previous_info.get('playing'):
-                            send_media_info({"artist": "Unknown", "title": "No media is currently playing"}, device_name)
+                            await loop.run_in_executor(None, send_media_info, {"artist": "Unknown", "title": "No media is currently playing"}, device_name)
                             previous_info = None
                         continue
                     
@@ -603,7 +451,7 @@ def monitor_media_info_macos_stream(device_name):
                         
                         # Handle artwork if present in diff
                         if payload.get('artworkData'):
-                            thumbnail_path = save_artwork(payload['artworkData'])
+                            thumbnail_path = await loop.run_in_executor(None, save_artwork, payload['artworkData'])
                             media_info['thumbnail'] = thumbnail_path
                         
                         # Update only fields that are present in payload
@@ -628,7 +476,7 @@ def monitor_media_info_macos_stream(device_name):
                         # Handle artwork
                         thumbnail_path = None
                         if payload.get('artworkData'):
-                            thumbnail_path = save_artwork(payload['artworkData'])
+                            thumbnail_path = await loop.run_in_executor(None, save_artwork, payload['artworkData'])
                         
                         media_info = {
                             "title": payload.get('title', 'Unknown'),
@@ -666,12 +514,16 @@ def monitor_media_info_macos_stream(device_name):
                         if media_info.get('duration', 0) == 0:
                             media_info['duration'] = 0
                     
-                    # Calculate position based on timestamp (if playing and timestamp available)
+                    # Bring the anchor up to now. The pair is re-stamped so a
+                    # later diff merge that copies it never counts the same
+                    # elapsed time twice.
                     if media_info.get('playing') and media_info.get('timestamp'):
-                        elapsed_since_timestamp = time.time() - media_info['timestamp']
-                        base_position = media_info.get('position', 0) or 0
-                        calculated_position = base_position + elapsed_since_timestamp
-                        media_info['position'] = calculated_position
+                        media_info['position'] = extrapolate(
+                            media_info.get('position') or 0,
+                            media_info['timestamp'],
+                            True,
+                        )
+                        media_info['timestamp'] = time.time()
                     
                     # Only send if position < duration (skip if at end)
                     # But allow 0 duration (unknown duration case)
@@ -684,23 +536,19 @@ def monitor_media_info_macos_stream(device_name):
                         continue
                     
                     if should_send_update(media_info, previous_info):
-                        send_media_info(media_info, device_name)
+                        await loop.run_in_executor(None, send_media_info, media_info, device_name)
                         previous_info = media_info
                     else:
                         previous_info = media_info
                 
-            except json.JSONDecodeError:
-                continue
             except Exception as e:
                 print(f"Error processing stream: {e}")
                 continue
         
-    except KeyboardInterrupt:
+    except asyncio.CancelledError:
         print("Song Detector Plus exited.")
     finally:
-        if process:
-            process.terminate()
-            process.wait()
+        await messages.aclose()
 
 if __name__ == "__main__":
     # Check OS support
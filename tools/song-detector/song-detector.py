@@ -3,18 +3,13 @@ import os
 import argparse
 import platform
 import subprocess
-import json
-import shutil
-import sys
 import base64
 from pathlib import Path
 from urllib.parse import quote
 
 # Platform-specific imports
 if platform.system() == "Windows":
-    from winsdk.windows.media.control import \
-        GlobalSystemMediaTransportControlsSessionManager as MediaManager
-    from winsdk.windows.storage.streams import DataReader
+    import smtc_session
 elif platform.system() == "Linux":
     try:
         import dbus
@@ -22,42 +17,24 @@ elif platform.system() == "Linux":
         print("⚠️  dbus-python not installed. Install with: pip install dbus-python")
         exit(1)
 elif platform.system() == "Darwin":
-    # macOS - uses subprocess for AppleScript, no additional imports needed
-    pass
+    import macos_media_stream
+
+# Event-driven SMTC session, created on first use and kept for the process
+_smtc_provider = None
+# macOS now-playing stream, likewise; False once it turned out unavailable
+_macos_stream = None
 
 async def get_windows_media_info():
-    """Get current media info on Windows using WinSDK"""
-    sessions = await MediaManager.request_async()
-    current_session = sessions.get_current_session()
-    if current_session:
-        info = await current_session.try_get_media_properties_async()
-        
-        # Get thumbnail/album art
-        thumbnail_path = None
-        if info.thumbnail:
-            try:
-                thumb_stream = await info.thumbnail.open_read_async()
-                reader = DataReader(thumb_stream)
-                await reader.load_async(thumb_stream.size)
-                
-                # Save thumbnail to LedFx assets directory
-                appdata = Path(os.getenv('APPDATA'))
-                assets_dir = appdata / ".ledfx" / "assets"
-                assets_dir.mkdir(parents=True, exist_ok=True)
-                thumbnail_path = assets_dir / "current_album_art.jpg"
-                
-                buffer = reader.read_buffer(thumb_stream.size)
-                with open(thumbnail_path, 'wb') as f:
-                    f.write(bytearray(buffer))
-                
-                reader.close()
-                thumb_stream.close()
-            except Exception as e:
-                print(f"Failed to save album art: {e}")
-        
+    """Get current media info on Windows from the cached SMTC session"""
+    global _smtc_provider
+    if _smtc_provider is None:
+        _smtc_provider = await smtc_session.start_windows_provider(smtc_session.save_windows_thumbnail)
+    
+    info = _smtc_provider.state
+    if info:
         # Extract artist and title from the title field itself
         # YouTube titles are usually formatted as "Artist - Song Title"
-        title_raw = info.title or "Unknown"
+        title_raw = info["title"] or "Unknown"
         
         if ' - ' in title_raw:
             # Split at first dash to get artist and title
@@ -66,14 +43,14 @@ async def get_windows_media_info():
             title = parts[1].strip()
         else:
             # Fallback to using the info fields
-            artist = info.artist or "Unknown"
+            artist = info["artist"] or "Unknown"
             title = title_raw
         
         return {
             "title": title,
             "artist": artist,
-            "album": info.album_title,
-            "thumbnail": str(thumbnail_path) if thumbnail_path else None
+            "album": info["album"],
+            "thumbnail": info["thumbnail"]
         }
     return None
 
@@ -135,17 +112,8 @@ def get_linux_media_info():
         return None
 
 def get_macos_media_info():
-    """Get current media info on macOS using media-control or bundled mediaremote-adapter"""
-    
-    # Helper function to get script directory (works with PyInstaller)
-    def get_resource_path(relative_path):
-        """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            # PyInstaller creates a temp folder and stores path in _MEIPASS
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-        return os.path.join(base_path, relative_path)
+    """Get current media info on macOS from the shared media-control / mediaremote-adapter stream"""
+    global _macos_stream
     
     def save_artwork(artwork_data):
         """Save base64-encoded artwork to file"""
@@ -167,65 +135,27 @@ def get_macos_media_info():
             return None
     
     try:
-        media_info = None
-        
-        # Strategy 1: Try system-installed media-control (if available)
-        if shutil.which('media-control'):
-            try:
-                result = subprocess.run(
-                    ['media-control', 'get'],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                
-                if result.returncode == 0 and result.stdout.strip():
-                    data = json.loads(result.stdout.strip())
-                    if data and data.get('playing') and data.get('title'):
-                        thumbnail_path = None
-                        if data.get('artworkData'):
-                            thumbnail_path = save_artwork(data['artworkData'])
-                        
-                        media_info = {
-                            "title": data.get('title', 'Unknown'),
-                            "artist": data.get('artist', 'Unknown'),
-                            "album": data.get('album', ''),
-                            "thumbnail": thumbnail_path
-                        }
-            except Exception as e:
-                print(f"media-control failed: {e}")
+        if _macos_stream is None:
+            _macos_stream = macos_media_stream.start_macos_stream() or False
         
-        # Strategy 2: Use bundled mediaremote-adapter framework
-        if not media_info:
-            try:
-                framework_path = get_resource_path('MediaRemoteAdapter.framework')
-                perl_script = get_resource_path('mediaremote-adapter.pl')
-                
-                if os.path.exists(framework_path) and os.path.exists(perl_script):
-                    result = subprocess.run(
-                        ['/usr/bin/perl', perl_script, framework_path, 'get'],
-                        capture_output=True,
-                        text=True,
-                        timeout=2
-                    )
-                    
-                    if result.returncode == 0 and result.stdout.strip():
-                        data = json.loads(result.stdout.strip())
-                        if data and data.get('playing') and data.get('title'):
-                            thumbnail_path = None
-                            if data.get('artworkData'):
-                                thumbnail_path = save_artwork(data['artworkData'])
-                            
-                            media_info = {
-                                "title": data.get('title', 'Unknown'),
-                                "artist": data.get('artist', 'Unknown'),
-                                "album": data.get('album', ''),
-                                "thumbnail": thumbnail_path
-                            }
-            except Exception as e:
-                print(f"bundled mediaremote-adapter failed: {e}")
+        # Serve from the stream; a one-shot get only if it can't run
+        if _macos_stream and _macos_stream.alive:
+            data = _macos_stream.current()
+        else:
+            data = macos_media_stream.read_once()
         
-        return media_info
+        if data and data.get('playing') and data.get('title'):
+            thumbnail_path = None
+            if data.get('artworkData'):
+                thumbnail_path = save_artwork(data['artworkData'])
+            
+            return {
+                "title": data.get('title', 'Unknown'),
+                "artist": data.get('artist', 'Unknown'),
+                "album": data.get('album', ''),
+                "thumbnail": thumbnail_path
+            }
+        return None
         
     except Exception as e:
         print(f"Failed to get media info: {e}")
@@ -268,7 +198,7 @@ def send_media_info(info, device_name):
 async def monitor_media_info(device_name):
     if platform.system() == "Darwin":
         # macOS: Use streaming mode for real-time updates
-        monitor_media_info_macos_stream(device_name)
+        await monitor_media_info_macos_stream(device_name)
     else:
         # Windows/Linux: Poll every second
         previous_info = None
@@ -285,17 +215,9 @@ async def monitor_media_info(device_name):
         except asyncio.CancelledError:
             print("Song Detector exited.")
 
-def monitor_media_info_macos_stream(device_name):
+async def monitor_media_info_macos_stream(device_name):
     """Monitor media info on macOS using stream mode for real-time updates"""
     
-    def get_resource_path(relative_path):
-        """Get absolute path to resource, works for dev and for PyInstaller"""
-        try:
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-        return os.path.join(base_path, relative_path)
-    
     def save_artwork(artwork_data):
         """Save base64-encoded artwork to file"""
         try:
@@ -313,46 +235,22 @@ def monitor_media_info_macos_stream(device_name):
             print(f"Failed to save album art: {e}")
             return None
     
+    # System media-control first, then the bundled mediaremote-adapter
+    command = macos_media_stream.stream_command()
+    if not command:
+        print("⚠️  No media-control method available on macOS")
+        return
+    
+    loop = asyncio.get_running_loop()
     previous_info = None
-    process = None
+    messages = macos_media_stream.stream_messages(command)
     
     try:
-        # Try system media-control first
-        if shutil.which('media-control'):
-            process = subprocess.Popen(
-                ['media-control', 'stream'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
-        else:
-            # Use bundled mediaremote-adapter
-            framework_path = get_resource_path('MediaRemoteAdapter.framework')
-            perl_script = get_resource_path('mediaremote-adapter.pl')
-            
-            if os.path.exists(framework_path) and os.path.exists(perl_script):
-                process = subprocess.Popen(
-                    ['/usr/bin/perl', perl_script, framework_path, 'stream'],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
-                )
-        
-        if not process:
-            print("⚠️  No media-control method available on macOS")
-            return
-        
-        # Read streaming output line by line
-        for line in process.stdout:
+        # Messages are decoded as the process prints them, and artwork files
+        # and the protocol handler go to the thread pool, so the event loop
+        # (and the LedFx WebSocket on it) never waits for the stream
+        async for data in messages:
             try:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                data = json.loads(line)
-                
                 # Check if it's a data payload (stream outputs multiple types)
                 if data.get('type') == 'data':
                     payload = data.get('payload', {})
@@ -360,7 +258,7 @@ def monitor_media_info_macos_stream(device_name):
                     if payload and payload.get('playing') and payload.get('title'):
                         thumbnail_path = None
                         if payload.get('artworkData'):
-                            thumbnail_path = save_artwork(payload['artworkData'])
+                            thumbnail_path = await loop.run_in_executor(None, save_artwork, payload['artworkData'])
                         
                         media_info = {
                             "title": payload.get('title', 'Unknown'),
@@ -370,26 +268,22 @@ def monitor_media_info_macos_stream(device_name):
                         }
                         
                         if media_info != previous_info:
-                            send_media_info(media_info, device_name)
+                            await loop.run_in_executor(None, send_media_info, media_info, device_name)
                             previous_info = media_info
                     else:
                         # No media playing
                         if previous_info is not None:
-                            send_media_info({"artist": "Unknown", "title": "No media is currently playing"}, device_name)
+                            await loop.run_in_executor(None, send_media_info, {"artist": "Unknown", "title": "No media is currently playing"}, device_name)
                             previous_info = None
                 
-            except json.JSONDecodeError:
-                continue
             except Exception as e:
                 print(f"Error processing stream: {e}")
                 continue
         
-    except KeyboardInterrupt:
+    except asyncio.CancelledError:
         print("Song Detector exited.")
     finally:
-        if process:
-            process.terminate()
-            process.wait()
+        await messages.aclose()
 
 if __name__ == "__main__":
     # Check OS support
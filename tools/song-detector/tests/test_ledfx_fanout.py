@@ -0,0 +1,180 @@
+"""Tests for publishing song_info to several LedFx instances.
+
+Each LedFx is a local websockets server standing in for /api/websocket and
+recording what it receives.
+"""
+
+import asyncio
+import json
+
+import websockets
+
+import ledfx_fanout
+from ledfx_fanout import FanOut
+
+
+class StandIn:
+    """A local WebSocket server that records every message it receives"""
+
+    def __init__(self):
+        self.received = []
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await websockets.serve(
+            self._handler, "127.0.0.1", self.port or 0
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/api/websocket"
+
+    @property
+    def titles(self):
+        return [json.loads(message)["title"] for message in self.received]
+
+    async def _handler(self, ws):
+        async for message in ws:
+            self.received.append(message)
+
+
+async def wait_until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_publish_reaches_every_endpoint():
+    async def run():
+        servers = [await StandIn().start() for _ in range(3)]
+        fanout = FanOut([server.url for server in servers])
+        fanout.start()
+        try:
+            await wait_until(
+                lambda: all(endpoint.connected for endpoint in fanout.endpoints)
+            )
+            for title in ("One", "Two"):
+                fanout.publish({"title": title, "artist": "A"})
+            await wait_until(lambda: all(len(s.received) == 2 for s in servers))
+
+            for server in servers:
+                assert server.titles == ["One", "Two"]
+                message = json.loads(server.received[0])
+                assert message["type"] == "song_info"
+                assert message["artist"] == "A"
+
+            assert fanout.published == 2
+            for health in fanout.health():
+                assert health["connected"] is True
+                assert health["queued"] == 0
+                assert health["sent"] == 2
+                assert health["dropped"] == 0
+                assert health["connects"] == 1
+                assert health["failures"] == 0
+                assert health["last_send_ms"] is not None
+        finally:
+            await fanout.stop()
+            for server in servers:
+                await server.stop()
+
+    asyncio.run(run())
+
+
+def test_stalled_endpoint_drops_oldest_without_blocking_others():
+    async def run():
+        servers = [await StandIn().start() for _ in range(2)]
+        stalled_url = "ws://127.0.0.1:1/api/websocket"
+        never = asyncio.Event()
+
+        async def connect(url):
+            if url == stalled_url:
+                await never.wait()  # an instance that never answers
+            return await ledfx_fanout.websocket_connect(url)
+
+        fanout = FanOut(
+            [servers[0].url, stalled_url, servers[1].url],
+            connect=connect,
+            queue_size=3,
+        )
+        fanout.start()
+        try:
+            await wait_until(
+                lambda: fanout.endpoints[0].connected
+                and fanout.endpoints[2].connected
+            )
+            titles = [f"Song {n}" for n in range(10)]
+            for count, title in enumerate(titles, 1):
+                fanout.publish({"title": title})
+                # The others keep up while the stalled queue overflows
+                await wait_until(
+                    lambda: all(len(s.received) == count for s in servers)
+                )
+
+            for server in servers:
+                assert server.titles == titles
+            stalled = fanout.endpoints[1]
+            queued = [
+                json.loads(message)["title"]
+                for message in list(stalled._queue._queue)
+            ]
+            assert queued == titles[-3:]
+
+            health = fanout.health()
+            assert health[1]["connected"] is False
+            assert health[1]["queued"] == 3
+            assert health[1]["dropped"] == 7
+            assert health[1]["sent"] == 0
+            assert [health[0]["dropped"], health[2]["dropped"]] == [0, 0]
+        finally:
+            await fanout.stop()
+            for server in servers:
+                await server.stop()
+
+    asyncio.run(run())
+
+
+def test_restarted_server_gets_the_latest_state(monkeypatch):
+    monkeypatch.setattr(ledfx_fanout, "RECONNECT_MIN", 0.05)
+
+    async def run():
+        server = await StandIn().start()
+        fanout = FanOut([server.url])
+        endpoint = fanout.endpoints[0]
+        fanout.start()
+        try:
+            await wait_until(lambda: endpoint.connected)
+            fanout.publish({"title": "One"})
+            await wait_until(lambda: server.titles == ["One"])
+
+            await server.stop()
+            await wait_until(lambda: not endpoint.connected)
+            # Published while the instance is away
+            fanout.publish({"title": "Two"})
+            fanout.publish({"title": "Three"})
+
+            await server.start()
+            await wait_until(lambda: len(server.received) == 2)
+            # Only the latest state is sent on reconnecting
+            assert server.titles == ["One", "Three"]
+
+            (health,) = fanout.health()
+            assert health["connected"] is True
+            assert health["connects"] == 2
+            assert health["failures"] >= 1
+            assert health["last_error"]
+            assert health["sent"] == 2
+            assert health["dropped"] == 1
+            assert health["queued"] == 0
+        finally:
+            await fanout.stop()
+            await server.stop()
+
+    asyncio.run(run())
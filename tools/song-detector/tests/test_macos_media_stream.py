@@ -0,0 +1,231 @@
+"""Tests for the macOS now-playing stream.
+
+The adapter is replaced by a fake producer - this Python, printing the lines
+it is given - so they run anywhere, no macOS or MediaRemote needed.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+
+from macos_media_stream import (
+    CHUNK_SIZE,
+    MAX_FAILURES,
+    JsonLinesParser,
+    MacMediaStream,
+    apply_message,
+    stream_messages,
+)
+
+# Writes each chunk of the JSON list in argv[1] to stdout as it is, flushed,
+# a moment apart, so the reader sees the chunk boundaries the test chose
+PRODUCER = """
+import json, sys, time
+with open(sys.argv[1]) as f:
+    chunks = json.load(f)
+for chunk in chunks:
+    sys.stdout.buffer.write(chunk.encode())
+    sys.stdout.buffer.flush()
+    time.sleep(0.01)
+"""
+
+
+def producer(tmp_path, *chunks):
+    # In a file, as artwork lines are longer than an argument may be
+    chunk_file = tmp_path / "chunks.json"
+    chunk_file.write_text(json.dumps(chunks))
+    return [sys.executable, "-c", PRODUCER, str(chunk_file)]
+
+
+def line(message):
+    return json.dumps(message) + "\n"
+
+
+def data(payload, diff=False):
+    return {"type": "data", "diff": diff, "payload": payload}
+
+
+def collect(command, **kwargs):
+    async def run():
+        return [message async for message in stream_messages(command, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_lines_split_across_chunks(tmp_path):
+    text = line(data({"title": "One"})) + line(data({"title": "Two"}))
+    # Written in three pieces, neither at a line end, and read a few bytes
+    # at a time
+    chunks = (text[:10], text[10:40], text[40:])
+
+    messages = collect(producer(tmp_path, *chunks), chunk_size=7)
+
+    assert messages == [data({"title": "One"}), data({"title": "Two"})]
+
+
+def test_line_longer_than_a_chunk(tmp_path):
+    artwork = "A" * (3 * CHUNK_SIZE)
+    text = line(data({"title": "One", "artworkData": artwork}))
+
+    messages = collect(producer(tmp_path, text, line(data({"title": "Two"}))))
+
+    assert [m["payload"]["title"] for m in messages] == ["One", "Two"]
+    assert messages[0]["payload"]["artworkData"] == artwork
+
+
+def test_garbage_and_non_objects_are_skipped(tmp_path):
+    chunks = (
+        "not json at all\n",
+        line(data({"title": "One"})),
+        "[1, 2, 3]\n",
+        '"a string"\n',
+        "\n",
+        '{"type": "data", "payload": \n',
+        line(data({"title": "Two"})),
+    )
+
+    messages = collect(producer(tmp_path, *chunks))
+
+    assert messages == [data({"title": "One"}), data({"title": "Two"})]
+
+
+def test_diff_with_nulls_removes_keys(tmp_path):
+    chunks = (
+        line(data({"title": "One", "artist": "A", "album": "X"})),
+        line(data({"title": "Two", "album": None}, diff=True)),
+    )
+
+    state = None
+    for message in collect(producer(tmp_path, *chunks)):
+        state = apply_message(state, message)
+
+    assert state == {"title": "Two", "artist": "A"}
+
+
+def test_last_line_without_newline(tmp_path):
+    chunks = (line(data({"title": "One"})), json.dumps(data({"title": "Two"})))
+
+    messages = collect(producer(tmp_path, *chunks))
+
+    assert messages == [data({"title": "One"}), data({"title": "Two"})]
+
+
+def test_parser_counts_bad_lines():
+    parser = JsonLinesParser()
+
+    assert parser.feed(b'{"a": 1}\nnope\n[1]\n{"b"') == [{"a": 1}]
+    assert parser.feed(b": 2}") == []
+    assert parser.close() == [{"b": 2}]
+    assert parser.bad_lines == 2
+
+
+class FakeProcess:
+    """Popen result whose stdout yields the given text lines
+
+    With stay_open it then blocks, like a stream waiting for the next
+    change, until terminated; otherwise it exits at once.
+    """
+
+    def __init__(self, lines, stay_open=False):
+        self._lines = lines
+        self._stay_open = stay_open
+        self._terminated = threading.Event()
+        self.stdout = self._read()
+
+    def _read(self):
+        yield from self._lines
+        if self._stay_open:
+            self._terminated.wait()
+
+    def terminate(self):
+        self._terminated.set()
+
+    def wait(self):
+        return 0
+
+
+class FakePopen:
+    """Hands out the given processes in turn, then silent ones that exit"""
+
+    def __init__(self, *processes):
+        self._processes = list(processes)
+        self.commands = []
+
+    def __call__(self, command, **kwargs):
+        self.commands.append(command)
+        if self._processes:
+            return self._processes.pop(0)
+        return FakeProcess([])
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_stream_current_after_a_diff():
+    popen = FakePopen(
+        FakeProcess(
+            [
+                line(data({"title": "One", "artist": "A", "album": "X"})),
+                line(data({"title": "Two", "album": None}, diff=True)),
+            ],
+            stay_open=True,
+        )
+    )
+    stream = MacMediaStream(["adapter", "stream"], popen=popen).start()
+    try:
+        wait_for(lambda: stream.stats["messages"] == 2)
+        assert stream.current() == {"title": "Two", "artist": "A"}
+        assert popen.commands == [["adapter", "stream"]]
+    finally:
+        stream.stop()
+
+
+def test_stream_restarts_after_exit():
+    popen = FakePopen(
+        FakeProcess([line(data({"title": "One"}))]),
+        FakeProcess([line(data({"title": "Two"}))], stay_open=True),
+    )
+    stream = MacMediaStream(["adapter"], popen=popen, restart_delay=0).start()
+    try:
+        wait_for(lambda: stream.stats["starts"] == 2 and stream.stats["messages"] == 2)
+        assert stream.current() == {"title": "Two"}
+        assert stream.alive
+    finally:
+        stream.stop()
+
+
+def test_stream_gives_up_after_max_failures():
+    popen = FakePopen()  # every process exits without a word
+    stream = MacMediaStream(["adapter"], popen=popen, restart_delay=0).start()
+    try:
+        wait_for(lambda: stream.failed)
+        assert stream.stats["starts"] == MAX_FAILURES
+        assert not stream.alive
+        # Nothing to wait for once it has given up
+        started = time.monotonic()
+        assert stream.current() is None
+        assert time.monotonic() - started < 1.0
+    finally:
+        stream.stop()
+
+
+def test_stream_current_waits_only_on_the_first_call():
+    # An adapter that starts but stays silent
+    popen = FakePopen(FakeProcess([], stay_open=True))
+    stream = MacMediaStream(["adapter"], popen=popen).start()
+    try:
+        started = time.monotonic()
+        assert stream.current(timeout=0.2) is None
+        assert time.monotonic() - started >= 0.2
+
+        started = time.monotonic()
+        assert stream.current(timeout=0.2) is None
+        assert time.monotonic() - started < 0.1
+    finally:
+        stream.stop()
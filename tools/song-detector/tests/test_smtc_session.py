@@ -0,0 +1,251 @@
+"""Tests for the event-driven SMTC session provider.
+
+Driven through a fake session manager with the same method names as the
+WinRT one, so they run anywhere - no winsdk, no Windows.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from smtc_session import PLAYBACK_STATUS_PLAYING, SMTCSessionProvider
+
+
+class FakeEvent:
+    """One WinRT event: add_/remove_ with tokens, fire() calls the handlers"""
+
+    def __init__(self):
+        self.handlers = {}
+        self._next_token = 0
+
+    def add(self, handler):
+        self._next_token += 1
+        self.handlers[self._next_token] = handler
+        return self._next_token
+
+    def remove(self, token):
+        del self.handlers[token]
+
+    def fire(self):
+        for handler in list(self.handlers.values()):
+            handler(None, None)
+
+
+class FakeSession:
+    def __init__(self, title="Song", thumbnail="art-1"):
+        self.events = {
+            name: FakeEvent()
+            for name in (
+                "media_properties_changed",
+                "playback_info_changed",
+                "timeline_properties_changed",
+            )
+        }
+        self.properties = media_properties(title, thumbnail)
+        self.timeline = SimpleNamespace(
+            position=timedelta(seconds=10),
+            start_time=timedelta(0),
+            end_time=timedelta(seconds=200),
+            last_updated_time=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+        self.playback = SimpleNamespace(playback_status=PLAYBACK_STATUS_PLAYING)
+        # Set to hold try_get_media_properties_async until released
+        self.gate = None
+
+    def __getattr__(self, name):
+        for event_name, event in self.events.items():
+            if name == f"add_{event_name}":
+                return event.add
+            if name == f"remove_{event_name}":
+                return event.remove
+        raise AttributeError(name)
+
+    async def try_get_media_properties_async(self):
+        properties = self.properties
+        if self.gate is not None:
+            await self.gate.wait()
+        return properties
+
+    def get_timeline_properties(self):
+        return self.timeline
+
+    def get_playback_info(self):
+        return self.playback
+
+
+class FakeManager:
+    def __init__(self, session):
+        self.session = session
+        self.session_changed = FakeEvent()
+
+    def get_current_session(self):
+        return self.session
+
+    def add_current_session_changed(self, handler):
+        return self.session_changed.add(handler)
+
+    def remove_current_session_changed(self, token):
+        self.session_changed.remove(token)
+
+
+def media_properties(title, thumbnail):
+    return SimpleNamespace(
+        title=title,
+        artist="Artist",
+        album_title="Album",
+        thumbnail=thumbnail,
+    )
+
+
+def make_provider(manager):
+    reads = []
+
+    async def read_thumbnail(thumbnail):
+        reads.append(thumbnail)
+        return f"image of {thumbnail}".encode()
+
+    def save_thumbnail(data):
+        return f"/art/{data.decode()}"
+
+    return SMTCSessionProvider(manager, read_thumbnail, save_thumbnail), reads
+
+
+async def settle(provider):
+    """Let the handlers' call_soon_threadsafe and every refresh run"""
+    await asyncio.sleep(0)
+    while provider._pending:
+        await asyncio.sleep(0)
+
+
+def test_snapshot_from_the_session():
+    async def run():
+        manager = FakeManager(FakeSession())
+        provider, _ = make_provider(manager)
+        await provider.start()
+
+        state = provider.state
+        assert state["title"] == "Song"
+        assert state["thumbnail"] == "/art/image of art-1"
+        assert state["position"] == 10
+        assert state["duration"] == 200
+        assert state["playing"] is True
+        assert state["timestamp"] == datetime(
+            2026, 1, 1, tzinfo=timezone.utc
+        ).timestamp()
+        provider.stop()
+
+    asyncio.run(run())
+
+
+def test_thumbnail_read_only_when_identity_changes():
+    async def run():
+        session = FakeSession()
+        manager = FakeManager(session)
+        provider, reads = make_provider(manager)
+        await provider.start()
+        assert reads == ["art-1"]
+
+        # A burst for the same track does not touch the image again
+        for _ in range(3):
+            session.events["media_properties_changed"].fire()
+            await settle(provider)
+        assert reads == ["art-1"]
+        assert provider.stats["thumbnail_skips"] == 3
+
+        session.properties = media_properties("Next song", "art-2")
+        session.events["media_properties_changed"].fire()
+        await settle(provider)
+        assert reads == ["art-1", "art-2"]
+        assert provider.state["title"] == "Next song"
+        assert provider.state["thumbnail"] == "/art/image of art-2"
+        provider.stop()
+
+    asyncio.run(run())
+
+
+def test_event_during_refresh_runs_it_again():
+    async def run():
+        session = FakeSession(thumbnail=None)
+        manager = FakeManager(session)
+        provider, reads = make_provider(manager)
+        await provider.start()
+        refreshes = provider.stats["media_refreshes"]
+
+        # The first event's refresh is still awaiting the properties when the
+        # second one - the one that carries the artwork - arrives
+        session.gate = asyncio.Event()
+        session.events["media_properties_changed"].fire()
+        await asyncio.sleep(0)
+        assert provider._pending == {"media"}
+        session.properties = media_properties("Song", "art-1")
+        session.events["media_properties_changed"].fire()
+        session.events["media_properties_changed"].fire()
+        await asyncio.sleep(0)
+        assert provider._dirty == {"media"}
+
+        session.gate.set()
+        await settle(provider)
+
+        # Collapsed into one re-run, which saw the artwork
+        assert provider.stats["media_refreshes"] == refreshes + 2
+        assert provider._dirty == set()
+        assert reads == ["art-1"]
+        assert provider.state["thumbnail"] == "/art/image of art-1"
+        provider.stop()
+
+    asyncio.run(run())
+
+
+def test_current_session_changed_rebinds():
+    async def run():
+        first = FakeSession(title="First", thumbnail="art-1")
+        manager = FakeManager(first)
+        provider, reads = make_provider(manager)
+        await provider.start()
+        assert all(len(event.handlers) == 1 for event in first.events.values())
+
+        second = FakeSession(title="Second", thumbnail="art-2")
+        second.playback = SimpleNamespace(playback_status=5)
+        manager.session = second
+        manager.session_changed.fire()
+        await settle(provider)
+
+        # Unsubscribed from the old session, subscribed to the new one
+        assert all(not event.handlers for event in first.events.values())
+        assert all(len(event.handlers) == 1 for event in second.events.values())
+        assert provider.stats["session_changes"] == 1
+        assert provider.state["title"] == "Second"
+        assert provider.state["playing"] is False
+        assert reads == ["art-1", "art-2"]
+
+        # No session at all: nothing playing
+        manager.session = None
+        manager.session_changed.fire()
+        await settle(provider)
+        assert provider.state is None
+        assert all(not event.handlers for event in second.events.values())
+
+        provider.stop()
+        assert not manager.session_changed.handlers
+
+    asyncio.run(run())
+
+
+def test_no_thumbnail_saver_never_reads_artwork():
+    async def run():
+        manager = FakeManager(FakeSession())
+        reads = []
+
+        async def read_thumbnail(thumbnail):
+            reads.append(thumbnail)
+            return b"image"
+
+        provider = SMTCSessionProvider(manager, read_thumbnail, None)
+        await provider.start()
+
+        assert provider.state["title"] == "Song"
+        assert provider.state["thumbnail"] is None
+        assert reads == []
+        provider.stop()
+
+    asyncio.run(run())
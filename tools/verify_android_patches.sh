@@ -33,6 +33,23 @@ PATCHES=(
   remote_submix_echo.patch
   boot_status.patch
   android_capture_control.patch
+  event_listener_gating.patch
+  android_quiet_logging.patch
+  thread_priority_boost.patch
+  nowplaying_polling.patch
+  nowplaying_artwork_offload.patch
+  nowplaying_song_detected_coalesce.patch
+  visualisation_subscriptions.patch
+  visualisation_binary_frames.patch
+  event_lazy_construction.patch
+  frame_timing.patch
+  render_scheduler.patch
+  audio_latency_tracer.patch
+  parallel_startup.patch
+  lazy_imports.patch
+  boot_profiler.patch
+  mdns_resolver.patch
+  audio_capture_buffers.patch
 )
 
 echo "==> Cloning LedFx/LedFx@main (fresh, depth 1) ..."